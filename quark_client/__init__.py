@@ -20,6 +20,8 @@ from .core.api_client import QuarkAPIClient
 from .exceptions import (APIError, AuthenticationError, ConfigError,
                          DownloadError, FileNotFoundError, NetworkError,
                          QuarkClientError, ShareLinkError)
+# 数据类型
+from .models import FileAction, FileRecord
 # 服务类
 from .services.file_service import FileService
 from .services.share_service import ShareService
@@ -42,6 +44,10 @@ __all__ = [
     'ShareService',
     'QuarkAPIClient',
 
+    # 数据类型
+    'FileAction',
+    'FileRecord',
+
     # 异常
     'QuarkClientError',
     'AuthenticationError',
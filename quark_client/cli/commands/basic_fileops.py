@@ -56,13 +56,18 @@ def delete_files(paths: List[str], force: bool = False, use_id: bool = False):
                 # 显示要删除的文件信息
                 print_warning(f"准备删除 {len(file_ids)} 个文件/文件夹:")
 
+                try:
+                    files_info = client.get_files_info(file_ids)
+                except Exception:
+                    files_info = {}
+
                 for i, file_id in enumerate(file_ids, 1):
-                    try:
-                        file_info = client.get_file_info(file_id)
+                    file_info = files_info.get(file_id)
+                    if file_info:
                         file_name = file_info.get('file_name', file_id)
                         file_type = "文件夹" if file_info.get('file_type') == 0 else "文件"
                         print_info(f"  {i}. {file_type}: {file_name}")
-                    except:
+                    else:
                         print_info(f"  {i}. ID: {file_id}")
             else:
                 # 使用路径解析
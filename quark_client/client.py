@@ -18,19 +18,20 @@ from .services.share_service import ShareService
 class QuarkClient:
     """夸克网盘客户端主类"""
 
-    def __init__(self, cookies: Optional[str] = None, auto_login: bool = True):
+    def __init__(self, cookies: Optional[str] = None, auto_login: bool = True, prefetch_subdirs: bool = False):
         """
         初始化夸克网盘客户端
 
         Args:
             cookies: Cookie字符串，如果为None则自动获取
             auto_login: 是否自动登录
+            prefetch_subdirs: 列出文件夹后是否在后台预取各子文件夹的第一页（适合逐级浏览）
         """
         # 初始化API客户端
         self.api_client = QuarkAPIClient(cookies=cookies, auto_login=auto_login)
 
         # 初始化服务
-        self.files = FileService(self.api_client)
+        self.files = FileService.for_client(self.api_client, prefetch_subdirs=prefetch_subdirs)
         self.upload = FileUploadService(self.api_client)
         self.download = FileDownloadService(self.api_client)
         self.shares = ShareService(self.api_client)
@@ -81,6 +82,15 @@ class QuarkClient:
         """获取文件信息"""
         return self.files.get_file_info(file_id)
 
+    def get_files_info(self, file_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """批量获取文件信息"""
+        return self.files.get_files_info(file_ids)
+
+    def invalidate_cache(self, file_id: Optional[str] = None):
+        """丢弃本地缓存的列表、文件信息和下载链接（file_id 为 None 时丢弃全部）"""
+        self.files.invalidate_cache(file_id)
+        self.download.invalidate_cache(file_id)
+
     def search_files(self, keyword: str, **kwargs) -> Dict[str, Any]:
         """搜索文件"""
         return self.files.search_files(keyword, **kwargs)
@@ -388,6 +398,9 @@ class QuarkClient:
 
     def close(self):
         """关闭客户端"""
+        self.download.close()
+        self.upload.close()
+        self.files.close()
         self.api_client.close()
 
     def __enter__(self):
@@ -18,6 +18,14 @@ def get_config_dir() -> Path:
     return Path.cwd() / 'config'
 
 
+def _get_env_int(name: str, default: int) -> int:
+    """读取正整数类型的环境变量，未设置或无效时返回默认值"""
+    try:
+        return max(1, int(os.getenv(name, default)))
+    except ValueError:
+        return default
+
+
 def get_default_headers() -> Dict[str, str]:
     """获取默认的HTTP请求头"""
     return {
@@ -46,6 +54,16 @@ class Config:
         'uc_param_str': '',
     }
 
+    # 获取下载链接时使用的参数（与 reference.py 完全相同）
+    DOWNLOAD_PARAMS = {
+        'pr': 'ucpro',
+        'fr': 'pc',
+        'sys': 'win32',
+        've': '2.5.56',
+        'ut': '',
+        'guid': '',
+    }
+
     # 请求超时设置
     REQUEST_TIMEOUT = 60.0
 
@@ -58,5 +76,11 @@ class Config:
     MAX_PAGE_SIZE = 100
 
     # 文件下载设置
-    DOWNLOAD_CHUNK_SIZE = 8192
+    DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+    DOWNLOAD_WRITE_BUFFER = 1024 * 1024
+    # 超过该大小且服务器支持Range时分段并发下载
+    RANGE_DOWNLOAD_THRESHOLD = 64 * 1024 * 1024
+    RANGE_DOWNLOAD_WORKERS = 4
+    # 批量下载时同时下载的文件数
+    DOWNLOAD_WORKERS = _get_env_int('QUARKPAN_MAX_CONCURRENT', 4)
     DOWNLOAD_DIR = 'downloads'
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+"""
+JSON编解码
+
+安装了orjson时使用orjson（更快），否则回退到标准库json。
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+
+    def dumps(obj: Any) -> bytes:
+        """将对象编码为紧凑的UTF-8 JSON"""
+        return orjson.dumps(obj)
+
+    loads = orjson.loads
+except ImportError:
+    def dumps(obj: Any) -> bytes:
+        """将对象编码为紧凑的UTF-8 JSON"""
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    loads = json.loads
@@ -2,15 +2,26 @@
 夸克网盘API客户端核心模块
 """
 
-import json
 import time
-from typing import Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
 
 import httpx
 
 from ..auth import QuarkAuth
 from ..config import Config, get_default_headers
 from ..exceptions import APIError, AuthenticationError, NetworkError
+from ._json import dumps as _json_dumps
+from ._json import loads as _json_loads
+
+if TYPE_CHECKING:
+    from ..services.file_service import FileService
+
+# 安装了h2时，HTTP客户端启用HTTP/2（同一主机的并发请求复用一个连接）
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
 
 
 class QuarkAPIClient:
@@ -29,6 +40,12 @@ class QuarkAPIClient:
         self._client = None
         self._auth = None
 
+        # 由Cookie jar拼接出的Cookie头缓存，收到Set-Cookie响应时失效
+        self._jar_cookie_header: Optional[str] = None
+
+        # 该客户端共享的文件服务实例，由 FileService.for_client 创建
+        self._file_service: Optional["FileService"] = None
+
         # 初始化HTTP客户端
         self._init_client()
 
@@ -39,11 +56,27 @@ class QuarkAPIClient:
     def _init_client(self):
         """初始化HTTP客户端"""
         self._client = httpx.Client(
+            http2=HTTP2_AVAILABLE,
             timeout=Config.REQUEST_TIMEOUT,
             headers=get_default_headers(),
-            follow_redirects=True
+            follow_redirects=True,
+            event_hooks={'response': [self._on_response]}
         )
 
+    def _on_response(self, response: httpx.Response):
+        """响应钩子：服务器设置了新Cookie时使Cookie头缓存失效"""
+        if 'set-cookie' in response.headers:
+            self._jar_cookie_header = None
+
+    @property
+    def jar_cookie_header(self) -> str:
+        """HTTP客户端Cookie jar中所有Cookie拼接成的Cookie头"""
+        header = self._jar_cookie_header
+        if header is None:
+            header = '; '.join(f'{cookie.name}={cookie.value}' for cookie in self._client.cookies.jar)
+            self._jar_cookie_header = header
+        return header
+
     def _ensure_authenticated(self):
         """确保已认证"""
         if not self.cookies:
@@ -77,7 +110,7 @@ class QuarkAPIClient:
 
         return headers
 
-    def _make_request(
+    def _send_request(
         self,
         method: str,
         url: str,
@@ -86,26 +119,13 @@ class QuarkAPIClient:
         json_data: Optional[Dict] = None,
         headers: Optional[Dict] = None,
         base_url: Optional[str] = None
-    ) -> Dict[str, Any]:
+    ) -> httpx.Response:
         """
-        发送HTTP请求
-
-        Args:
-            method: HTTP方法
-            url: 请求URL
-            params: URL参数
-            data: 表单数据
-            json_data: JSON数据
-            headers: 额外的请求头
-            base_url: 基础URL，默认使用Config.BASE_URL
-
-        Returns:
-            响应的JSON数据
+        发送HTTP请求，返回原始响应
 
         Raises:
-            APIError: API调用失败
+            APIError: 不支持的HTTP方法
             NetworkError: 网络错误
-            AuthenticationError: 认证失败
         """
         if base_url is None:
             base_url = Config.BASE_URL
@@ -119,21 +139,21 @@ class QuarkAPIClient:
         try:
             # 发送请求
             if method.upper() == 'GET':
-                response = self._client.get(  # type: ignore[attr-defined]
+                return self._client.get(  # type: ignore[attr-defined]
                     full_url,
                     params=request_params,
                     headers=request_headers
                 )
             elif method.upper() == 'POST':
                 if json_data:
-                    response = self._client.post(  # type: ignore[attr-defined]
+                    return self._client.post(  # type: ignore[attr-defined]
                         full_url,
                         params=request_params,
-                        json=json_data,
+                        content=_json_dumps(json_data),
                         headers=request_headers
                     )
                 else:
-                    response = self._client.post(  # type: ignore[attr-defined]
+                    return self._client.post(  # type: ignore[attr-defined]
                         full_url,
                         params=request_params,
                         data=data,
@@ -142,44 +162,124 @@ class QuarkAPIClient:
             else:
                 raise APIError(f"不支持的HTTP方法: {method}")
 
-            # 检查HTTP状态码
-            if response.status_code == 401:
-                raise AuthenticationError("认证失败，请重新登录")
-            elif response.status_code == 403:
-                raise AuthenticationError("访问被拒绝，可能是Cookie过期")
-            elif response.status_code >= 400:
-                try:
-                    error_data = response.json()
-                    error_msg = f"HTTP错误: {response.status_code}, 响应: {error_data}"
-                except:
-                    error_msg = f"HTTP错误: {response.status_code}, 响应: {response.text}"
-                raise APIError(error_msg, status_code=response.status_code)
-
-            # 解析JSON响应
+        except httpx.TimeoutException:
+            raise NetworkError("请求超时")
+        except httpx.RequestError as e:
+            raise NetworkError(f"网络请求失败: {e}")
+
+    def _parse_response(self, response: httpx.Response) -> Dict[str, Any]:
+        """
+        检查响应状态并解析JSON
+
+        Raises:
+            APIError: API调用失败
+            AuthenticationError: 认证失败
+        """
+        # 检查HTTP状态码
+        if response.status_code == 401:
+            raise AuthenticationError("认证失败，请重新登录")
+        elif response.status_code == 403:
+            raise AuthenticationError("访问被拒绝，可能是Cookie过期")
+        elif response.status_code >= 400:
             try:
-                result = response.json()
-            except json.JSONDecodeError:
-                raise APIError(f"响应不是有效的JSON格式: {response.text[:200]}")
+                error_data = _json_loads(response.content)
+                error_msg = f"HTTP错误: {response.status_code}, 响应: {error_data}"
+            except:
+                error_msg = f"HTTP错误: {response.status_code}, 响应: {response.text}"
+            raise APIError(error_msg, status_code=response.status_code, code=response.status_code)
 
-            # 检查API响应状态
-            if isinstance(result, dict):
-                status = result.get('status')
-                code = result.get('code')
-                message = result.get('message', '未知错误')
+        # 解析JSON响应
+        try:
+            result = _json_loads(response.content)
+        except ValueError:
+            raise APIError(f"响应不是有效的JSON格式: {response.text[:200]}")
+
+        # 检查API响应状态
+        if isinstance(result, dict):
+            status = result.get('status')
+            code = result.get('code')
+            message = result.get('message', '未知错误')
+
+            # 检查不同的错误状态
+            if status == 'error' or (code and code != 0):
+                if 'login' in message.lower() or 'auth' in message.lower():
+                    raise AuthenticationError(f"认证错误: {message}")
+                else:
+                    raise APIError(
+                        f"API错误: {message}",
+                        status_code=status if isinstance(status, int) else None,
+                        response_data=result,
+                        code=code if isinstance(code, int) else None
+                    )
 
-                # 检查不同的错误状态
-                if status == 'error' or (code and code != 0):
-                    if 'login' in message.lower() or 'auth' in message.lower():
-                        raise AuthenticationError(f"认证错误: {message}")
-                    else:
-                        raise APIError(f"API错误: {message}", response_data=result)
+        return result
 
-            return result
+    def _make_request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict] = None,
+        data: Optional[Dict] = None,
+        json_data: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+        base_url: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        发送HTTP请求
 
-        except httpx.TimeoutException:
-            raise NetworkError("请求超时")
-        except httpx.RequestError as e:
-            raise NetworkError(f"网络请求失败: {e}")
+        Args:
+            method: HTTP方法
+            url: 请求URL
+            params: URL参数
+            data: 表单数据
+            json_data: JSON数据
+            headers: 额外的请求头
+            base_url: 基础URL，默认使用Config.BASE_URL
+
+        Returns:
+            响应的JSON数据
+
+        Raises:
+            APIError: API调用失败
+            NetworkError: 网络错误
+            AuthenticationError: 认证失败
+        """
+        response = self._send_request(method, url, params, data, json_data, headers, base_url)
+        return self._parse_response(response)
+
+    def conditional_get(
+        self,
+        url: str,
+        params: Optional[Dict] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        **kwargs
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[str], Optional[str]]:
+        """
+        发送条件GET请求（If-None-Match / If-Modified-Since）
+
+        Args:
+            url: 请求URL
+            params: URL参数
+            etag: 上次响应的ETag
+            last_modified: 上次响应的Last-Modified
+
+        Returns:
+            (响应JSON, ETag, Last-Modified) 元组；服务器返回304时响应JSON为None
+        """
+        headers = dict(kwargs.pop('headers', None) or {})
+        if etag:
+            headers['if-none-match'] = etag
+        if last_modified:
+            headers['if-modified-since'] = last_modified
+
+        response = self._send_request('GET', url, params=params, headers=headers, **kwargs)
+
+        if response.status_code == 304:
+            return None, etag, last_modified
+
+        result = self._parse_response(response)
+        return result, response.headers.get('etag'), response.headers.get('last-modified')
 
     def get(self, url: str, params: Optional[Dict] = None, **kwargs) -> Dict[str, Any]:
         """发送GET请求"""
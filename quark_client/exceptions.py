@@ -23,10 +23,17 @@ class ConfigError(QuarkClientError):
 class APIError(QuarkClientError):
     """API调用异常"""
 
-    def __init__(self, message: str, status_code: Optional[int] = None, response_data: Optional[dict] = None):
+    def __init__(
+        self,
+        message: str,
+        status_code: Optional[int] = None,
+        response_data: Optional[dict] = None,
+        code: Optional[int] = None
+    ):
         super().__init__(message)
         self.status_code = status_code
         self.response_data = response_data
+        self.code = code
 
 
 class NetworkError(QuarkClientError):
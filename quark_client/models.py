@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+文件列表记录与操作类型
+"""
+
+from array import array
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+
+class FileRecord:
+    """文件列表中的单条记录（使用__slots__，比dict占用更少内存）"""
+
+    __slots__ = ('fid', 'name', 'size', 'updated_at', 'is_dir', 'pdir_fid')
+
+    def __init__(
+        self,
+        fid: str,
+        name: str,
+        size: int = 0,
+        updated_at: int = 0,
+        is_dir: bool = False,
+        pdir_fid: str = ""
+    ):
+        self.fid = fid
+        self.name = name
+        self.size = size
+        self.updated_at = updated_at
+        self.is_dir = is_dir
+        self.pdir_fid = pdir_fid
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'FileRecord':
+        """
+        从API返回的文件字典创建记录
+
+        Args:
+            data: 文件信息字典
+
+        Returns:
+            文件记录
+        """
+        return cls(
+            data.get('fid', ''),
+            data.get('file_name', ''),
+            data.get('size') or 0,
+            data.get('updated_at') or 0,
+            bool(data.get('dir', False)),
+            data.get('pdir_fid', '')
+        )
+
+    def __repr__(self) -> str:
+        kind = 'dir' if self.is_dir else 'file'
+        return f"FileRecord({kind} {self.name!r}, fid={self.fid!r}, size={self.size})"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, FileRecord):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+
+class FileAction(NamedTuple):
+    """
+    文件变更操作，用于 FileService.apply_actions
+
+    action 取值：
+        'delete' - 删除 file_ids
+        'move'   - 将 file_ids 移动到 target_folder_id
+        'rename' - 将 file_ids[0] 重命名为 new_name
+    """
+    action: str
+    file_ids: List[str]
+    target_folder_id: Optional[str] = None
+    new_name: Optional[str] = None
+
+
+def to_columns(files: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    将文件字典列表转换为按列存储的结构
+
+    数值列使用array存储，便于整体求和、排序等统计操作。
+
+    Args:
+        files: 文件信息字典列表
+
+    Returns:
+        {'fid': [...], 'name': [...], 'size': array('q'), 'updated_at': array('q'), 'is_dir': array('b')}
+    """
+    fids: List[str] = []
+    names: List[str] = []
+    sizes = array('q')
+    updated = array('q')
+    is_dir = array('b')
+
+    for f in files:
+        fids.append(f.get('fid', ''))
+        names.append(f.get('file_name', ''))
+        sizes.append(f.get('size') or 0)
+        updated.append(f.get('updated_at') or 0)
+        is_dir.append(1 if f.get('dir', False) else 0)
+
+    return {'fid': fids, 'name': names, 'size': sizes, 'updated_at': updated, 'is_dir': is_dir}
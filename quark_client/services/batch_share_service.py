@@ -24,7 +24,7 @@ class BatchShareService:
             client: API客户端实例
         """
         self.client = client
-        self.file_service = FileService(client)
+        self.file_service = FileService.for_client(client)
         self.share_service = ShareService(client)
         self.logger = get_logger(__name__)
 
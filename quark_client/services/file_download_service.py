@@ -4,10 +4,48 @@
 """
 
 import os
-from typing import Callable, Dict, List, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Set, Tuple
 
-from ..core.api_client import QuarkAPIClient
+import httpx
+
+from ..config import Config
+from ..core.api_client import HTTP2_AVAILABLE, QuarkAPIClient
 from ..exceptions import APIError
+from ..utils.fileio import preallocate, release_page_cache
+from ..utils.logger import get_logger
+from ..utils.progress import ProgressThrottle
+
+# 下载请求头（固定不变）
+_DOWNLOAD_HEADERS = {
+    'Accept': '*/*',
+    'Accept-Language': 'zh-CN,zh;q=0.9',
+    'Cache-Control': 'no-cache',
+    'Pragma': 'no-cache',
+    'Referer': 'https://pan.quark.cn/',
+    'Origin': 'https://pan.quark.cn',
+    'Sec-Ch-Ua': '"Not;A=Brand";v="99", "Google Chrome";v="139", "Chromium";v="139"',
+    'Sec-Ch-Ua-Mobile': '?1',
+    'Sec-Ch-Ua-Platform': '"Android"',
+    'Sec-Fetch-Dest': 'empty',
+    'Sec-Fetch-Mode': 'cors',
+    'Sec-Fetch-Site': 'same-site',
+    'User-Agent': 'Mozilla/5.0 (Linux; Android 6.0; Nexus 5 Build/MRA58N) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/139.0.0.0 Mobile Safari/537.36'
+}
+
+# 备用下载客户端的连接池限制
+_DOWNLOAD_LIMITS = httpx.Limits(max_connections=16, max_keepalive_connections=8)
+
+# 每种下载方式在网络中断时的最大尝试次数
+_DOWNLOAD_ATTEMPTS = 3
+
+# 未完成下载的临时文件后缀，用于断点续传
+_PARTIAL_SUFFIX = '.part'
+
+# 下载链接是短期有效的签名链接，缓存时间需短于其有效期（秒）
+_URL_CACHE_TTL = 50.0
 
 
 class FileDownloadService:
@@ -21,6 +59,33 @@ class FileDownloadService:
             client: API客户端实例
         """
         self.client = client
+        self.logger = get_logger(__name__)
+
+        # 下载链接缓存：文件ID -> (下载链接, 文件名, 文件大小, 过期时间)
+        self._url_cache: Dict[str, Tuple[str, str, int, float]] = {}
+        self._url_cache_lock = threading.Lock()
+
+        # 备用下载方式使用的持久化客户端（懒加载，复用连接）
+        self._download_client: Optional[httpx.Client] = None
+        self._download_client_lock = threading.Lock()
+
+    def _get_download_client(self) -> httpx.Client:
+        """获取备用下载客户端，安装了h2时启用HTTP/2"""
+        with self._download_client_lock:
+            if self._download_client is None:
+                self._download_client = httpx.Client(
+                    http2=HTTP2_AVAILABLE,
+                    timeout=60,
+                    limits=_DOWNLOAD_LIMITS
+                )
+            return self._download_client
+
+    def close(self):
+        """关闭备用下载客户端"""
+        with self._download_client_lock:
+            if self._download_client is not None:
+                self._download_client.close()
+                self._download_client = None
 
     def get_download_url(self, file_id: str) -> str:
         """
@@ -32,32 +97,20 @@ class FileDownloadService:
         Returns:
             下载链接
         """
-        # 使用与 reference.py 完全相同的参数
-        params = {
-            'pr': 'ucpro',
-            'fr': 'pc',
-            'sys': 'win32',
-            've': '2.5.56',
-            'ut': '',
-            'guid': '',
-        }
-
         data = {'fids': [file_id]}
 
         # 使用完整的API端点URL，绕过基础URL拼接
         response = self.client.post(
             'file/download',
             json_data=data,
-            params=params,
+            params=Config.DOWNLOAD_PARAMS,
             base_url='https://drive-pc.quark.cn/1/clouddrive'
         )
 
         # 解析下载链接
-        if isinstance(response, dict) and 'data' in response:
-            data_list = response['data']
-            if data_list and len(data_list) > 0:
-                download_info = data_list[0]
-                return download_info.get('download_url', '')
+        data_list = response.get('data') if isinstance(response, dict) else None
+        if data_list:
+            return data_list[0].get('download_url', '')
 
         raise APIError("无法获取下载链接")
 
@@ -71,16 +124,9 @@ class FileDownloadService:
         Returns:
             文件ID到下载链接的映射字典
         """
-        # 添加必要的查询参数
-        params = {
-            'pr': 'ucpro',
-            'fr': 'pc',
-            'uc_param_str': ''
-        }
-
         data = {'fids': file_ids}
 
-        response = self.client.post('file/download', json_data=data, params=params)
+        response = self.client.post('file/download', json_data=data)
 
         # 解析下载链接
         download_urls = {}
@@ -98,7 +144,7 @@ class FileDownloadService:
         self,
         file_id: str,
         save_path: Optional[str] = None,
-        chunk_size: int = 8192,
+        chunk_size: int = Config.DOWNLOAD_CHUNK_SIZE,
         progress_callback: Optional[Callable] = None
     ) -> str:
         """
@@ -115,42 +161,97 @@ class FileDownloadService:
         """
 
         # 获取下载链接和文件信息
-        # 使用与 reference.py 完全相同的参数
-        params = {
-            'pr': 'ucpro',
-            'fr': 'pc',
-            'sys': 'win32',
-            've': '2.5.56',
-            'ut': '',
-            'guid': '',
-        }
+        download_url, file_name, file_size = self._resolve_downloads([file_id])[file_id]
 
-        data = {'fids': [file_id]}
+        return self._download_resolved(download_url, file_name, save_path, chunk_size, progress_callback, file_size,
+                                       file_id)
+
+    def _resolve_downloads(self, file_ids: List[str]) -> Dict[str, Tuple[str, str, int]]:
+        """
+        批量获取下载链接和文件名
+
+        Args:
+            file_ids: 文件ID列表
+
+        Returns:
+            文件ID到 (下载链接, 文件名, 文件大小) 的映射
+
+        Raises:
+            APIError: 任一文件无法获取下载链接
+        """
+        resolved = {}
+        now = time.monotonic()
+        with self._url_cache_lock:
+            for fid in file_ids:
+                cached = self._url_cache.get(fid)
+                if cached and cached[3] > now:
+                    resolved[fid] = cached[:3]
+
+        pending = [fid for fid in file_ids if fid not in resolved]
+        if pending:
+            resolved.update(self._request_downloads(pending))
+
+        return resolved
+
+    def _request_downloads(self, file_ids: List[str]) -> Dict[str, Tuple[str, str, int]]:
+        """请求下载链接并写入缓存"""
+        data = {'fids': file_ids}
 
         # 使用完整的API端点URL，绕过基础URL拼接
         response = self.client.post(
             'file/download',
             json_data=data,
-            params=params,
+            params=Config.DOWNLOAD_PARAMS,
             base_url='https://drive-pc.quark.cn/1/clouddrive'
         )
 
         # 解析下载链接和文件信息
-        if isinstance(response, dict) and 'data' in response:
-            data_list = response['data']
-            if data_list and len(data_list) > 0:
-                download_info = data_list[0]
-                download_url = download_info.get('download_url', '')
-                file_name = download_info.get('file_name', f'file_{file_id}')
-                _ = download_info.get('size', 0)  # file_size 暂时未使用
-            else:
-                raise APIError("无法获取下载信息")
-        else:
+        data_list = response.get('data') if isinstance(response, dict) else None
+        if not data_list:
             raise APIError("无法获取下载信息")
 
-        if not download_url:
-            raise APIError("无法获取下载链接")
+        resolved = {}
+        for index, download_info in enumerate(data_list):
+            # 单个文件时响应中可能不带fid
+            fid = download_info.get('fid') or (file_ids[index] if index < len(file_ids) else '')
+            download_url = download_info.get('download_url', '')
+            if fid and download_url:
+                resolved[fid] = (
+                    download_url,
+                    download_info.get('file_name', f'file_{fid}'),
+                    download_info.get('size') or 0
+                )
+
+        now = time.monotonic()
+        expires_at = now + _URL_CACHE_TTL
+        with self._url_cache_lock:
+            # 顺便清理已过期的链接
+            for fid in [fid for fid, cached in self._url_cache.items() if cached[3] <= now]:
+                del self._url_cache[fid]
+            for fid, entry in resolved.items():
+                self._url_cache[fid] = entry + (expires_at,)
+
+        missing = [fid for fid in file_ids if fid not in resolved]
+        if missing:
+            raise APIError(f"无法获取下载链接: {', '.join(missing)}")
+
+        return resolved
 
+    def _download_resolved(
+        self,
+        download_url: str,
+        file_name: str,
+        save_path: Optional[str],
+        chunk_size: int,
+        progress_callback: Optional[Callable] = None,
+        file_size: int = 0,
+        file_id: Optional[str] = None
+    ) -> str:
+        """
+        根据已获取的下载链接下载文件，返回实际保存的文件路径
+
+        网络中断时续传重试；提供 file_id 时，备用方式遇到401/403会重新获取一次下载链接。
+        """
         # 确定保存路径
         if save_path is None:
             save_path = file_name
@@ -165,136 +266,430 @@ class FileDownloadService:
         if save_dir:
             os.makedirs(save_dir, exist_ok=True)
 
-        # 下载文件，使用与API客户端相同的session和完整的headers
-        download_headers = {
-            'Accept': '*/*',
-            'Accept-Language': 'zh-CN,zh;q=0.9',
-            'Cache-Control': 'no-cache',
-            'Pragma': 'no-cache',
-            'Referer': 'https://pan.quark.cn/',
-            'Origin': 'https://pan.quark.cn',
-            'Sec-Ch-Ua': '"Not;A=Brand";v="99", "Google Chrome";v="139", "Chromium";v="139"',
-            'Sec-Ch-Ua-Mobile': '?1',
-            'Sec-Ch-Ua-Platform': '"Android"',
-            'Sec-Fetch-Dest': 'empty',
-            'Sec-Fetch-Mode': 'cors',
-            'Sec-Fetch-Site': 'same-site',
-            'User-Agent': 'Mozilla/5.0 (Linux; Android 6.0; Nexus 5 Build/MRA58N) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/139.0.0.0 Mobile Safari/537.36'
-        }
-
-        # 尝试多种下载方式
-        success = False
-
-        # 方法1: 使用API客户端的session
-        try:
-            with self.client._client.stream('GET', download_url,  # type: ignore[attr-defined]
-                                            headers=download_headers) as response:
-                response.raise_for_status()
-                success = True
-
-                # 获取文件大小
-                total_size = int(response.headers.get('content-length', 0))
-                downloaded_size = 0
-
-                with open(save_path, 'wb') as f:
-                    for chunk in response.iter_bytes(chunk_size=chunk_size):
-                        if chunk:
-                            f.write(chunk)
-                            downloaded_size += len(chunk)
-
-                            # 调用进度回调
-                            if progress_callback:
-                                progress_callback(downloaded_size, total_size)
-        except Exception as e:
-            # 第一种方法失败是正常的，静默切换到备用方法
-            if "403" in str(e) or "Forbidden" in str(e):
-                # 403错误是预期的，不显示错误信息
-                pass
+        # 依次尝试两种下载方式：
+        # 方法1 使用API客户端的session（大文件优先分段并发下载）；
+        # 方法2 使用独立的下载客户端，显式携带API客户端的Cookie
+        url_refreshed = False
+        for method in (1, 2):
+            attempt = 0
+            while True:
+                try:
+                    self._download_with_method(method, download_url, save_path, chunk_size, progress_callback,
+                                               file_size)
+                    return save_path
+                except httpx.TransportError as e:
+                    # 网络中断：已下载的部分保留在 .part 文件中，退避后续传
+                    attempt += 1
+                    if attempt >= _DOWNLOAD_ATTEMPTS:
+                        self._report_method_failure(method, e)
+                        break
+                    time.sleep(min(0.5 * 2 ** attempt, 5.0))
+                except httpx.HTTPStatusError as e:
+                    if (method == 2 and file_id and not url_refreshed
+                            and e.response.status_code in (401, 403)):
+                        # 签名链接可能已过期，重新获取一次后重试
+                        url_refreshed = True
+                        download_url = self._refresh_download_url(file_id)
+                        continue
+                    self._report_method_failure(method, e)
+                    break
+                except Exception as e:
+                    self._report_method_failure(method, e)
+                    break
+
+        raise APIError("所有下载方法都失败了，可能是夸克网盘的反爬虫机制")
+
+    def _download_with_method(
+        self,
+        method: int,
+        download_url: str,
+        save_path: str,
+        chunk_size: int,
+        progress_callback: Optional[Callable] = None,
+        file_size: int = 0
+    ):
+        """使用指定的下载方式（1或2）下载一次，失败时抛出异常"""
+        if method == 1:
+            client = self.client._client  # type: ignore[attr-defined]
+            headers = _DOWNLOAD_HEADERS
+        else:
+            client = self._get_download_client()
+            # 添加API客户端的cookies到headers
+            cookie_header = self.client.jar_cookie_header
+            headers = {**_DOWNLOAD_HEADERS, 'Cookie': cookie_header} if cookie_header else _DOWNLOAD_HEADERS
+
+        # 大文件优先分段并发下载
+        if file_size >= Config.RANGE_DOWNLOAD_THRESHOLD and self._download_ranges(
+                client, download_url, headers, save_path, chunk_size, progress_callback):
+            return
+
+        self._download_resumable(client, download_url, headers, save_path, chunk_size, progress_callback,
+                                 file_size)
+
+    def _report_method_failure(self, method: int, error: Exception):
+        """记录下载方式失败的提示"""
+        if method == 2:
+            self.logger.warning("方法2失败: %s", error)
+        elif not ("403" in str(error) or "Forbidden" in str(error)):
+            # 第一种方法遇到403是正常的，静默切换到备用方法；其他错误可能需要用户知道
+            self.logger.info("下载方法1遇到问题，正在尝试备用方法...")
+
+    def invalidate_cache(self, file_id: Optional[str] = None):
+        """
+        丢弃缓存的下载链接
+
+        Args:
+            file_id: 只丢弃该文件的下载链接，None表示丢弃全部
+        """
+        with self._url_cache_lock:
+            if file_id is None:
+                self._url_cache.clear()
             else:
-                # 其他错误可能需要用户知道
-                print(f"下载方法1遇到问题，正在尝试备用方法...")
-            success = False
+                self._url_cache.pop(file_id, None)
+
+    def _refresh_download_url(self, file_id: str) -> str:
+        """丢弃缓存的下载链接并重新获取"""
+        with self._url_cache_lock:
+            self._url_cache.pop(file_id, None)
+        return self._request_downloads([file_id])[file_id][0]
 
-        # 方法2: 如果方法1失败，尝试使用外部httpx客户端
-        if not success:
+    @staticmethod
+    def _probe_range_size(client: httpx.Client, download_url: str, headers: Dict[str, str]) -> int:
+        """
+        探测服务器是否支持Range请求
+
+        Returns:
+            文件总大小，不支持Range时返回0
+
+        Raises:
+            httpx.HTTPStatusError: 服务器拒绝请求（如403），此下载方式不可用
+        """
+        with client.stream('GET', download_url, headers={**headers, 'Range': 'bytes=0-0'}) as response:
+            response.raise_for_status()
+            content_range = response.headers.get('content-range', '')
+            if response.status_code != 206 or '/' not in content_range:
+                return 0
+            total = content_range.rsplit('/', 1)[1]
+            return int(total) if total.isdigit() else 0
+
+    def _download_ranges(
+        self,
+        client: httpx.Client,
+        download_url: str,
+        headers: Dict[str, str],
+        save_path: str,
+        chunk_size: int,
+        progress_callback: Optional[Callable] = None
+    ) -> bool:
+        """
+        将大文件按字节范围分段，多个连接并发下载后写入各自的位置
+
+        数据写入 save_path + '.part'，所有分段完成后才重命名为 save_path；
+        任一分段失败时删除临时文件，不会留下看似完整的文件。
+
+        Returns:
+            是否已完成下载；文件较小、服务器不支持Range或存在待续传的 .part 文件时返回False
+        """
+        part_path = save_path + _PARTIAL_SUFFIX
+        if os.path.exists(part_path):
+            # 上次单连接下载中断留下的数据，交给续传逻辑处理
+            return False
+
+        total_size = self._probe_range_size(client, download_url, headers)
+        if total_size < Config.RANGE_DOWNLOAD_THRESHOLD:
+            return False
+
+        part_size = -(-total_size // Config.RANGE_DOWNLOAD_WORKERS)
+        ranges = [(start, min(start + part_size, total_size) - 1) for start in range(0, total_size, part_size)]
+
+        lock = threading.Lock()
+        failed = threading.Event()
+        throttle = ProgressThrottle()
+        downloaded = [0]
+
+        def fetch(start: int, end: int):
+            range_headers = {**headers, 'Range': f'bytes={start}-{end}'}
+            with client.stream('GET', download_url, headers=range_headers) as response:
+                if response.status_code != 206:
+                    raise APIError(f"分段下载失败: HTTP {response.status_code}")
+
+                if response.headers.get('content-encoding', 'identity') == 'identity':
+                    chunks = response.iter_raw(chunk_size=chunk_size)
+                else:
+                    chunks = response.iter_bytes(chunk_size=chunk_size)
+
+                received = 0
+                with open(part_path, 'r+b', buffering=Config.DOWNLOAD_WRITE_BUFFER) as f:
+                    f.seek(start)
+                    for chunk in release_page_cache(chunks, f, start):
+                        if failed.is_set():
+                            # 其他分段已失败，不必继续下载
+                            return
+                        f.write(chunk)
+                        received += len(chunk)
+
+                        if progress_callback:
+                            with lock:
+                                downloaded[0] += len(chunk)
+                                done = downloaded[0]
+                                report = throttle.ready(done) or done == total_size
+                            if report:
+                                progress_callback(done, total_size)
+
+                if received != end - start + 1:
+                    raise APIError(f"分段下载不完整: {start}-{end}")
+
+        def fetch_or_flag(start: int, end: int):
             try:
-                import httpx
+                fetch(start, end)
+            except BaseException:
+                failed.set()
+                raise
 
-                # 从API客户端获取cookies
-                cookie_dict = {}
-                if hasattr(self.client._client, 'cookies'):
-                    for cookie in self.client._client.cookies.jar:  # type: ignore[attr-defined]
-                        cookie_dict[cookie.name] = cookie.value
+        # 预先分配文件大小，各分段写入自己的偏移
+        with open(part_path, 'wb') as f:
+            preallocate(f, total_size)
+            f.truncate(total_size)
 
-                # 添加cookies到headers
-                if cookie_dict:
-                    download_headers['Cookie'] = '; '.join([f'{k}={v}' for k, v in cookie_dict.items()])
+        try:
+            with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+                futures = [executor.submit(fetch_or_flag, start, end) for start, end in ranges]
+                for future in futures:
+                    future.result()
+        except BaseException:
+            # 分段数据不完整，无法用于续传，直接删除
+            try:
+                os.remove(part_path)
+            except OSError:
+                pass
+            raise
 
-                with httpx.stream('GET', download_url, headers=download_headers, timeout=60) as response:
-                    response.raise_for_status()
-                    success = True
+        os.replace(part_path, save_path)
+        return True
 
-                    # 获取文件大小
-                    total_size = int(response.headers.get('content-length', 0))
-                    downloaded_size = 0
+    def _download_resumable(
+        self,
+        client: httpx.Client,
+        download_url: str,
+        headers: Dict[str, str],
+        save_path: str,
+        chunk_size: int,
+        progress_callback: Optional[Callable] = None,
+        file_size: int = 0
+    ):
+        """
+        下载到 save_path + '.part'，完成后重命名为 save_path
 
-                    with open(save_path, 'wb') as f:
-                        for chunk in response.iter_bytes(chunk_size=chunk_size):
-                            if chunk:
-                                f.write(chunk)
-                                downloaded_size += len(chunk)
+        已存在的 .part 文件（上次中断的下载）会用Range请求从断点继续，
+        仅当服务器返回的 Content-Range 总大小与 file_size 一致时才续传；
+        文件大小未知、服务器不支持Range、返回416或大小不符时从头下载。
+        下载失败时保留 .part 文件，供下次继续。
 
-                                # 调用进度回调
-                                if progress_callback:
-                                    progress_callback(downloaded_size, total_size)
-            except Exception as e:
-                print(f"方法2失败: {e}")
-                success = False
+        Args:
+            file_size: 从下载接口获取的文件大小，用于确认 .part 属于同一文件
+        """
+        part_path = save_path + _PARTIAL_SUFFIX
+        offset = os.path.getsize(part_path) if os.path.isfile(part_path) else 0
+        if not 0 < offset < file_size:
+            # 无法确认已有数据属于这个文件（或已不短于文件），从头下载
+            offset = 0
+
+        while True:
+            request_headers = {**headers, 'Range': f'bytes={offset}-'} if offset else headers
+            with client.stream('GET', download_url, headers=request_headers) as response:
+                if offset and not self._resumes_at(response, offset, file_size):
+                    if response.status_code in (206, 416):
+                        # 已有数据无法续传（范围不符或文件已变化），重新从头请求
+                        offset = 0
+                        continue
+                    # 服务器忽略了Range，返回完整内容，从头写入
+                    offset = 0
 
-        if not success:
-            raise APIError("所有下载方法都失败了，可能是夸克网盘的反爬虫机制")
+                response.raise_for_status()
+                self._save_stream(response, part_path, chunk_size, progress_callback, offset)
+            break
+
+        os.replace(part_path, save_path)
+
+    @staticmethod
+    def _resumes_at(response: httpx.Response, offset: int, file_size: int) -> bool:
+        """判断响应是否为同一文件从 offset 开始的剩余部分"""
+        return (
+            response.status_code == 206
+            and response.headers.get('content-range', '') == f'bytes {offset}-{file_size - 1}/{file_size}'
+            and response.headers.get('content-encoding', 'identity') == 'identity'
+        )
 
-        return save_path
+    @staticmethod
+    def _save_stream(
+        response: httpx.Response,
+        save_path: str,
+        chunk_size: int,
+        progress_callback: Optional[Callable] = None,
+        offset: int = 0
+    ):
+        """
+        将流式响应写入文件
+
+        响应未压缩时直接读取原始数据块，跳过httpx的解码层；
+        写入使用较大的文件缓冲区，合并为更大的磁盘写入。
+
+        Args:
+            response: 流式响应
+            save_path: 保存路径
+            chunk_size: 读取块大小
+            progress_callback: 进度回调函数 (downloaded_bytes, total_bytes)
+            offset: 续传时响应数据在文件中的起始位置，0表示从头写入
+        """
+        # 获取文件大小
+        total_size = int(response.headers.get('content-length', 0))
+        if total_size:
+            total_size += offset
+
+        if response.headers.get('content-encoding', 'identity') == 'identity':
+            chunks = response.iter_raw(chunk_size=chunk_size)
+        else:
+            chunks = response.iter_bytes(chunk_size=chunk_size)
+
+        with open(save_path, 'r+b' if offset else 'wb', buffering=Config.DOWNLOAD_WRITE_BUFFER) as f:
+            preallocate(f, total_size)
+            f.seek(offset)
+            try:
+                FileDownloadService._write_chunks(
+                    f, release_page_cache(chunks, f, offset), total_size, progress_callback, offset
+                )
+            finally:
+                # 实际数据与Content-Length不一致时，去掉预分配多出的部分
+                f.truncate()
+
+    @staticmethod
+    def _write_chunks(
+        f: BinaryIO,
+        chunks: Iterator[bytes],
+        total_size: int,
+        progress_callback: Optional[Callable] = None,
+        downloaded_size: int = 0
+    ):
+        """将数据块写入文件，按需调用进度回调"""
+        if not progress_callback:
+            # 无需进度回调时由writelines在C层循环写入
+            f.writelines(chunks)
+            return
+
+        throttle = ProgressThrottle()
+        reported_size = -1
+        for chunk in chunks:
+            if chunk:
+                f.write(chunk)
+                downloaded_size += len(chunk)
+
+                # 调用进度回调（限制频率）
+                if throttle.ready(downloaded_size):
+                    progress_callback(downloaded_size, total_size)
+                    reported_size = downloaded_size
+
+        if reported_size != downloaded_size:
+            progress_callback(downloaded_size, total_size)
+
+    @staticmethod
+    def _unique_path(path: str, taken: Set[str]) -> str:
+        """
+        为批量下载中重名的文件生成不冲突的路径
+
+        首个同名文件沿用原路径（与单文件下载一致，覆盖已有文件），
+        之后的同名文件依次加序号，并跳过已存在的文件。
+        """
+        if path not in taken:
+            return path
+
+        dir_path, filename = os.path.split(path)
+        name, ext = os.path.splitext(filename)
+        counter = 1
+        while True:
+            candidate = os.path.join(dir_path, f"{name}{counter}{ext}")
+            if candidate not in taken and not os.path.exists(candidate):
+                return candidate
+            counter += 1
 
     def download_files(
         self,
         file_ids: List[str],
         save_dir: str = "downloads",
-        chunk_size: int = 8192,
-        progress_callback: Optional[Callable] = None
+        chunk_size: int = Config.DOWNLOAD_CHUNK_SIZE,
+        progress_callback: Optional[Callable] = None,
+        max_workers: Optional[int] = None
     ) -> List[str]:
         """
-        批量下载文件
+        批量下载文件（多个文件并发下载）
 
         Args:
             file_ids: 文件ID列表
             save_dir: 保存目录
             chunk_size: 下载块大小
             progress_callback: 进度回调函数 (current_file, total_files, file_progress)
+            max_workers: 同时下载的文件数，默认为 Config.DOWNLOAD_WORKERS（环境变量 QUARKPAN_MAX_CONCURRENT）
 
         Returns:
             下载的文件路径列表
         """
 
         os.makedirs(save_dir, exist_ok=True)
-        downloaded_files = []
+        # 去除重复的文件ID，同一文件只下载一次
+        file_ids = list(dict.fromkeys(file_ids))
+        if not file_ids:
+            return []
 
-        for i, file_id in enumerate(file_ids, 1):
-            try:
-                def file_progress(downloaded, total):
-                    if progress_callback:
-                        progress_callback(i, len(file_ids), downloaded, total)
-
-                file_path = self.download_file(
-                    file_id,
-                    save_dir,
-                    chunk_size,
-                    file_progress
-                )
-                downloaded_files.append(file_path)
-
-            except Exception as e:
-                print(f"下载文件 {file_id} 失败: {e}")
-                continue
-
-        return downloaded_files
+        # 一次请求获取所有文件的下载链接
+        try:
+            resolved = self._resolve_downloads(file_ids)
+        except APIError:
+            # 批量获取失败时逐个获取，以免个别文件影响整批下载
+            resolved = {}
+            for file_id in file_ids:
+                try:
+                    resolved.update(self._resolve_downloads([file_id]))
+                except Exception as e:
+                    self.logger.warning("下载文件 %s 失败: %s", file_id, e)
+
+        # 提交前分配保存路径，同名文件依次加序号，避免并发下载互相覆盖
+        save_paths: Dict[str, str] = {}
+        taken: Set[str] = set()
+        for file_id in file_ids:
+            if file_id in resolved:
+                save_path = self._unique_path(os.path.join(save_dir, resolved[file_id][1]), taken)
+                taken.add(save_path)
+                save_paths[file_id] = save_path
+
+        # 多个文件并发下载，进度回调串行调用，调用方无需自行加锁
+        progress_lock = threading.Lock()
+
+        def download_one(index: int, file_id: str) -> str:
+            def file_progress(downloaded, total):
+                if progress_callback:
+                    with progress_lock:
+                        progress_callback(index, len(file_ids), downloaded, total)
+
+            download_url, file_name, file_size = resolved[file_id]
+            return self._download_resolved(download_url, file_name, save_paths[file_id], chunk_size,
+                                           file_progress, file_size, file_id)
+
+        results: Dict[int, str] = {}
+        if max_workers is None:
+            max_workers = Config.DOWNLOAD_WORKERS
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(file_ids)))) as executor:
+            futures = {
+                executor.submit(download_one, index, file_id): (index, file_id)
+                for index, file_id in enumerate(file_ids, 1)
+                if file_id in resolved
+            }
+
+            for future in as_completed(futures):
+                index, file_id = futures[future]
+                try:
+                    results[index] = future.result()
+                except Exception as e:
+                    self.logger.warning("下载文件 %s 失败: %s", file_id, e)
+
+        # 按输入顺序返回
+        return [results[index] for index in sorted(results)]
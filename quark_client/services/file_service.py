@@ -3,24 +3,328 @@
 文件管理服务
 """
 
+import fnmatch
 import os
-from typing import Any, Dict, List, Optional, Tuple
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple
 
-from ..core.api_client import QuarkAPIClient
+import httpx
+from tqdm import tqdm
+
+from ..config import Config
+from ..core.api_client import HTTP2_AVAILABLE, QuarkAPIClient
 from ..exceptions import APIError, FileNotFoundError
+from ..models import FileAction, FileRecord, to_columns
+from ..utils.fileio import preallocate
+from ..utils.progress import ProgressThrottle
+
+# get_file_info 的默认字段投影
+DEFAULT_INFO_FIELDS = ('fid', 'file_name', 'size', 'updated_at')
+
+# 表示文件/文件夹不存在的错误码（HTTP状态码及夸克业务码）
+_NOT_FOUND_CODES = frozenset({404, 31001})
+
+
+def _is_not_found(error: APIError) -> bool:
+    """判断API错误是否表示文件/文件夹不存在，未知错误码时按错误信息判断"""
+    if error.code in _NOT_FOUND_CODES or error.status_code in _NOT_FOUND_CODES:
+        return True
+    message = str(error).lower()
+    return 'not found' in message or '不存在' in message
+
+
+# 后台预取子文件夹列表的并发数与缓存有效期（秒）
+_PREFETCH_WORKERS = 16
+_PREFETCH_TTL = 30.0
+
+# 列表条件GET缓存的最大条目数
+_PAGE_CACHE_SIZE = 256
+
+# get_file_info 结果缓存的最大条目数与有效期（秒）
+_INFO_CACHE_SIZE = 512
+_INFO_CACHE_TTL = 300.0
+
+# 流式下载请求头（与 reference.py 一致，Cookie 在请求时加入）
+_STREAM_HEADERS = {
+    'user-agent': 'Mozilla/5.0 (Windows NT 10.0; WOW64) AppleWebKit/537.36 (KHTML, like Gecko)'
+                  ' Chrome/94.0.4606.71 Safari/537.36 Core/1.94.225.400 QQBrowser/12.2.5544.400',
+    'origin': 'https://pan.quark.cn',
+    'referer': 'https://pan.quark.cn/',
+    'accept-language': 'zh-CN,zh;q=0.9',
+}
+
+# 流式下载客户端的连接池限制
+_STREAM_LIMITS = httpx.Limits(max_connections=16, max_keepalive_connections=16)
+
+
+class _PageCacheEntry(NamedTuple):
+    """列表/树缓存条目"""
+    folder_id: str
+    snapshot: int
+    etag: Optional[str]
+    last_modified: Optional[str]
+    body: Dict[str, Any]
+    fresh_until: float  # 在此时间（time.monotonic）之前无需向服务器校验
+
+
+# 排序参数缓存：(sort_field, sort_order, 次级排序) -> _sort 参数值
+_SORT_CACHE: Dict[Tuple[str, str, str], str] = {}
+
+
+def _sort_param(sort_field: str, sort_order: str, secondary: str = '') -> str:
+    """获取 _sort 参数值，同一组合只拼接一次"""
+    key = (sort_field, sort_order, secondary)
+    value = _SORT_CACHE.get(key)
+    if value is None:
+        value = f"{sort_field}:{sort_order}{secondary}"
+        _SORT_CACHE[key] = value
+    return value
+
+
+class LazyFileInfo(dict):
+    """
+    按字段投影获取的文件信息
+
+    行为与普通字典一致；访问投影之外的字段时，才向服务器补全完整信息（只补全一次）
+    """
+
+    def __init__(self, data: Dict[str, Any], file_service: 'FileService', file_id: str):
+        super().__init__(data)
+        self._file_service = file_service
+        self._file_id = file_id
+        self._complete = False
+
+    def _top_up(self):
+        """补全完整的文件信息"""
+        if self._complete:
+            return
+        self._complete = True
+        full_info = self._file_service.get_file_info(self._file_id)
+        for key, value in full_info.items():
+            self.setdefault(key, value)
+
+    def __missing__(self, key: str) -> Any:
+        self._top_up()
+        if dict.__contains__(self, key):
+            return dict.__getitem__(self, key)
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if not dict.__contains__(self, key):
+            self._top_up()
+        return dict.get(self, key, default)
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith('_'):
+            raise AttributeError(name)
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
 
 
 class FileService:
     """文件管理服务"""
 
-    def __init__(self, client: QuarkAPIClient):
+    # 保护 for_client 中共享实例的创建
+    _for_client_lock = threading.Lock()
+
+    def __init__(self, client: QuarkAPIClient, prefetch_subdirs: bool = False):
         """
         初始化文件服务
 
         Args:
             client: API客户端实例
+            prefetch_subdirs: 列出文件夹后是否在后台预取各子文件夹的第一页
         """
         self.client = client
+        self.prefetch_subdirs = prefetch_subdirs
+        self._prefetch_executor: Optional[ThreadPoolExecutor] = None
+
+        # 文件夹快照版本号，文件夹内容变更时递增，旧版本的缓存自动失效
+        self._snap: Dict[str, int] = defaultdict(int)
+
+        # 条件GET缓存（LRU）：(url, params) -> 缓存条目
+        self._page_cache: 'OrderedDict[Tuple[str, Tuple], _PageCacheEntry]' = OrderedDict()
+        self._page_cache_lock = threading.Lock()
+
+        # 父文件夹索引：文件ID -> (父文件夹ID, 文件名)，从各列表/信息响应中收集
+        self._parent_map: Dict[str, Tuple[str, str]] = {}
+
+        # 文件信息缓存（LRU）：(文件ID, 字段) -> (过期时间, 文件信息)
+        self._info_cache: 'OrderedDict[Tuple[str, Tuple[str, ...]], Tuple[float, Dict[str, Any]]]' = OrderedDict()
+        self._info_cache_lock = threading.Lock()
+
+        # 流式下载使用的持久化客户端（懒加载，复用连接）
+        self._download_client: Optional[httpx.Client] = None
+        self._download_client_lock = threading.Lock()
+
+    @classmethod
+    def for_client(cls, client: QuarkAPIClient, prefetch_subdirs: Optional[bool] = None) -> 'FileService':
+        """
+        获取API客户端对应的文件服务实例（同一客户端只创建一次）
+
+        Args:
+            client: API客户端实例
+            prefetch_subdirs: 是否在后台预取子文件夹列表，None表示保持实例当前的设置（默认关闭）
+
+        Returns:
+            文件服务实例
+        """
+        # 实例保存在API客户端上，随客户端一起释放，使缓存在各调用方之间复用
+        with cls._for_client_lock:
+            service = client._file_service
+            if service is None:
+                service = cls(client)
+                client._file_service = service
+            if prefetch_subdirs is not None:
+                service.prefetch_subdirs = prefetch_subdirs
+        return service
+
+    def _get_download_client(self) -> httpx.Client:
+        """获取流式下载客户端，安装了h2时启用HTTP/2"""
+        with self._download_client_lock:
+            if self._download_client is None:
+                self._download_client = httpx.Client(
+                    http2=HTTP2_AVAILABLE,
+                    timeout=30,
+                    limits=_STREAM_LIMITS,
+                    follow_redirects=True
+                )
+            return self._download_client
+
+    def close(self):
+        """关闭流式下载客户端和后台预取线程池（之后再使用时会重新创建）"""
+        with self._download_client_lock:
+            if self._download_client is not None:
+                self._download_client.close()
+                self._download_client = None
+
+        if self._prefetch_executor is not None:
+            self._prefetch_executor.shutdown(wait=False)
+            self._prefetch_executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        _ = exc_type, exc_val, exc_tb  # 参数未使用
+        self.close()
+
+    def _cache_entry(self, key: Tuple[str, Tuple]) -> Optional[_PageCacheEntry]:
+        """获取缓存条目，文件夹快照已变更的条目视为不存在并直接丢弃"""
+        with self._page_cache_lock:
+            entry = self._page_cache.get(key)
+            if entry is None:
+                return None
+            if entry.snapshot != self._snap[entry.folder_id]:
+                del self._page_cache[key]
+                return None
+            self._page_cache.move_to_end(key)
+            return entry
+
+    def _cached_get(self, url: str, params: Dict[str, Any], ttl: float = 0.0) -> Dict[str, Any]:
+        """
+        带ETag/Last-Modified校验的GET请求，服务器返回304时复用缓存的响应
+
+        Args:
+            url: 请求URL
+            params: URL参数
+            ttl: 响应在多少秒内无需向服务器校验，0表示每次都校验
+
+        Returns:
+            响应数据（缓存的副本）
+        """
+        key = (url, tuple(sorted(params.items())))
+        folder_id = str(params.get('pdir_fid', ''))
+        snapshot = self._snap[folder_id]
+        cached = self._cache_entry(key)
+
+        if cached and time.monotonic() < cached.fresh_until:
+            return self._copy_response(cached.body)
+
+        etag, last_modified = (cached.etag, cached.last_modified) if cached else (None, None)
+
+        result, etag, last_modified = self.client.conditional_get(
+            url, params=params, etag=etag, last_modified=last_modified
+        )
+
+        if result is None and cached:
+            # 304 Not Modified
+            return self._copy_response(cached.body)
+
+        if result is None:
+            raise APIError("服务器返回304，但本地没有缓存")
+
+        if etag or last_modified or ttl > 0:
+            fresh_until = time.monotonic() + ttl if ttl > 0 else 0.0
+            with self._page_cache_lock:
+                self._page_cache[key] = _PageCacheEntry(folder_id, snapshot, etag, last_modified, result,
+                                                        fresh_until)
+                self._page_cache.move_to_end(key)
+                while len(self._page_cache) > _PAGE_CACHE_SIZE:
+                    self._page_cache.popitem(last=False)
+            return self._copy_response(result)
+
+        with self._page_cache_lock:
+            self._page_cache.pop(key, None)
+        return result
+
+    @staticmethod
+    def _copy_response(response: Dict[str, Any]) -> Dict[str, Any]:
+        """复制响应结构及列表中的各文件信息，避免调用方修改缓存内容"""
+        copied = dict(response)
+        data = copied.get('data')
+        if isinstance(data, dict):
+            data = dict(data)
+            if isinstance(data.get('list'), list):
+                data['list'] = [dict(f) if isinstance(f, dict) else f for f in data['list']]
+            copied['data'] = data
+        if isinstance(copied.get('metadata'), dict):
+            copied['metadata'] = dict(copied['metadata'])
+        return copied
+
+    def invalidate_cache(self, file_id: Optional[str] = None):
+        """
+        丢弃本地缓存的列表和文件信息
+
+        通过其他途径（网页端、其他客户端）修改了网盘内容后调用，下次访问时重新向服务器获取。
+
+        Args:
+            file_id: 只丢弃与该文件/文件夹相关的缓存，None表示丢弃全部缓存
+        """
+        if file_id is None:
+            with self._info_cache_lock:
+                self._info_cache.clear()
+            self._parent_map.clear()
+            with self._page_cache_lock:
+                self._page_cache.clear()
+            return
+
+        self._invalidate_folders(self._folders_containing([file_id]) + [file_id])
+        self._forget_file_info([file_id])
+
+    def _invalidate_folders(self, folder_ids: List[str]):
+        """递增指定文件夹的快照版本，使其列表/树缓存失效"""
+        for folder_id in set(folder_ids):
+            self._snap[folder_id] += 1
+
+    def _folders_containing(self, file_ids: List[str]) -> List[str]:
+        """从缓存的列表中查找包含指定文件的文件夹ID"""
+        targets = set(file_ids)
+        with self._page_cache_lock:
+            entries = [e for e in self._page_cache.values() if e.snapshot == self._snap[e.folder_id]]
+
+        folders = []
+        for entry in entries:
+            data = entry.body.get('data')
+            file_list = data.get('list', []) if isinstance(data, dict) else []
+            if any(f.get('fid') in targets for f in file_list):
+                folders.append(entry.folder_id)
+        return folders
 
     def list_files(
         self,
@@ -47,23 +351,110 @@ class FileService:
             'pdir_fid': folder_id,
             '_page': page,
             '_size': size,
-            '_sort': f"{sort_field}:{sort_order}"
+            '_sort': _sort_param(sort_field, sort_order)
         }
 
         try:
-            response = self.client.get('file/sort', params=params)
-            return response
+            response = self._cached_get('file/sort', params)
         except APIError as e:
-            if 'not found' in str(e).lower():
+            if _is_not_found(e):
                 raise FileNotFoundError(f"文件夹不存在: {folder_id}")
             raise
 
-    def get_file_info(self, file_id: str) -> Dict[str, Any]:
+        data = response.get('data')
+        if isinstance(data, dict):
+            self._remember_parents(data.get('list'))
+            self._seed_info_cache(data.get('list'))
+
+        if self.prefetch_subdirs:
+            self._prefetch_subfolders(response, size, params['_sort'])
+
+        return response
+
+    def _prefetch_subfolders(self, response: Dict[str, Any], size: int, sort: str):
+        """在后台预取各子文件夹的第一页，结果写入列表缓存"""
+        data = response.get('data')
+        file_list = data.get('list', []) if isinstance(data, dict) else []
+        subfolder_ids = [f['fid'] for f in file_list if f.get('dir', False) and f.get('fid')]
+        if not subfolder_ids:
+            return
+
+        if self._prefetch_executor is None:
+            self._prefetch_executor = ThreadPoolExecutor(
+                max_workers=_PREFETCH_WORKERS, thread_name_prefix='quark-prefetch'
+            )
+
+        for subfolder_id in subfolder_ids:
+            params = {'pdir_fid': subfolder_id, '_page': 1, '_size': size, '_sort': sort}
+            self._prefetch_executor.submit(self._prefetch_listing, params)
+
+    def _prefetch_listing(self, params: Dict[str, Any]):
+        """预取单个文件夹列表（后台线程中执行，失败时忽略）"""
+        key = ('file/sort', tuple(sorted(params.items())))
+        cached = self._cache_entry(key)
+        if cached and time.monotonic() < cached.fresh_until:
+            return
+        try:
+            self._cached_get('file/sort', params, ttl=_PREFETCH_TTL)
+        except Exception:
+            pass
+
+    def list_file_records(
+        self,
+        folder_id: str = "0",
+        page: int = 1,
+        size: int = 50,
+        sort_field: str = "file_name",
+        sort_order: str = "asc"
+    ) -> List[FileRecord]:
+        """
+        获取文件列表，返回FileRecord对象列表
+
+        Args:
+            folder_id: 文件夹ID，"0"表示根目录
+            page: 页码，从1开始
+            size: 每页数量
+            sort_field: 排序字段
+            sort_order: 排序方向
+
+        Returns:
+            文件记录列表
+        """
+        response = self.list_files(folder_id, page, size, sort_field, sort_order)
+        return [FileRecord.from_dict(f) for f in response.get('data', {}).get('list', [])]
+
+    def list_files_soa(
+        self,
+        folder_id: str = "0",
+        page: int = 1,
+        size: int = 50,
+        sort_field: str = "file_name",
+        sort_order: str = "asc"
+    ) -> Dict[str, Any]:
+        """
+        获取文件列表，按列返回（适合对大量文件做统计）
+
+        Args:
+            folder_id: 文件夹ID，"0"表示根目录
+            page: 页码，从1开始
+            size: 每页数量
+            sort_field: 排序字段
+            sort_order: 排序方向
+
+        Returns:
+            按列存储的文件列表，格式见 models.to_columns
+        """
+        response = self.list_files(folder_id, page, size, sort_field, sort_order)
+        return to_columns(response.get('data', {}).get('list', []))
+
+    def get_file_info(self, file_id: str, fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
         """
         获取文件详细信息
 
         Args:
             file_id: 文件ID
+            fields: 只请求指定字段（如 DEFAULT_INFO_FIELDS），None表示完整信息。
+                    指定字段时返回 LazyFileInfo，访问缺失字段时才补全完整信息
 
         Returns:
             文件信息字典
@@ -71,35 +462,139 @@ class FileService:
         if not file_id or file_id == "0":
             raise ValueError("无效的文件ID")
 
+        cache_key = (file_id, tuple(fields) if fields else ())
+        now = time.monotonic()
+        with self._info_cache_lock:
+            cached = self._info_cache.get(cache_key)
+            if cached and cached[0] > now:
+                self._info_cache.move_to_end(cache_key)
+                return self._wrap_file_info(dict(cached[1]), file_id, fields)
+
+        file_info = self._request_file_info(file_id, fields)
+        self._remember_parents([file_info])
+
+        with self._info_cache_lock:
+            self._info_cache[cache_key] = (now + _INFO_CACHE_TTL, file_info)
+            self._info_cache.move_to_end(cache_key)
+            while len(self._info_cache) > _INFO_CACHE_SIZE:
+                self._info_cache.popitem(last=False)
+
+        return self._wrap_file_info(dict(file_info), file_id, fields)
+
+    def get_files_info(self, file_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        批量获取多个文件的详细信息（未缓存的文件合并为一次请求）
+
+        Args:
+            file_ids: 文件ID列表
+
+        Returns:
+            文件ID到文件信息的映射，服务器未返回的文件不包含在内
+        """
+        result: Dict[str, Dict[str, Any]] = {}
+        now = time.monotonic()
+        with self._info_cache_lock:
+            for file_id in file_ids:
+                cached = self._info_cache.get((file_id, ()))
+                if cached and cached[0] > now:
+                    result[file_id] = dict(cached[1])
+
+        pending = [file_id for file_id in dict.fromkeys(file_ids) if file_id not in result]
+        if not pending:
+            return result
+
+        response = self.client.get('file', params={'fids': ','.join(pending)})
+        data = response.get('data') if isinstance(response, dict) else None
+        file_list = data.get('list') if isinstance(data, dict) else data
+        fetched = {f['fid']: f for f in file_list or [] if f.get('fid') in pending}
+        self._remember_parents(list(fetched.values()))
+
+        with self._info_cache_lock:
+            for file_id, file_info in fetched.items():
+                self._info_cache[(file_id, ())] = (now + _INFO_CACHE_TTL, file_info)
+                self._info_cache.move_to_end((file_id, ()))
+            while len(self._info_cache) > _INFO_CACHE_SIZE:
+                self._info_cache.popitem(last=False)
+
+        result.update((file_id, dict(file_info)) for file_id, file_info in fetched.items())
+        return result
+
+    def _request_file_info(self, file_id: str, fields: Optional[Sequence[str]]) -> Dict[str, Any]:
+        """向服务器请求文件信息"""
         params = {'fids': file_id}
+        if fields:
+            params['fields'] = ','.join(fields)
 
         try:
             response = self.client.get('file', params=params)
 
             # 检查响应格式
-            if isinstance(response, dict) and 'data' in response:
-                data = response['data']
-                if isinstance(data, dict) and 'list' in data:
-                    file_list = data['list']
-                    if file_list and len(file_list) > 0:
-                        # 查找匹配的文件ID
-                        for file_info in file_list:
-                            if file_info.get('fid') == file_id:
-                                return file_info
-
-                        # 如果没有找到精确匹配，返回第一个
-                        return file_list[0]
-                elif isinstance(data, list) and len(data) > 0:
-                    # 兼容旧格式
-                    return data[0]
+            data = response.get('data') if isinstance(response, dict) else None
+            if isinstance(data, dict):
+                file_list = data.get('list')
+                if file_list:
+                    # 查找匹配的文件ID，没有精确匹配时返回第一个
+                    return next((f for f in file_list if f.get('fid') == file_id), file_list[0])
+            elif isinstance(data, list) and data:
+                # 兼容旧格式
+                return data[0]
 
             raise FileNotFoundError(f"文件不存在: {file_id}")
 
         except APIError as e:
-            if 'not found' in str(e).lower():
+            if _is_not_found(e):
                 raise FileNotFoundError(f"文件不存在: {file_id}")
             raise
 
+    def _forget_file_info(self, file_ids: List[str]):
+        """删除/移动/重命名后，丢弃这些文件的信息缓存"""
+        targets = set(file_ids)
+        with self._info_cache_lock:
+            for key in [key for key in self._info_cache if key[0] in targets]:
+                del self._info_cache[key]
+        for file_id in targets:
+            self._parent_map.pop(file_id, None)
+
+    def _remember_parents(self, file_list: Any):
+        """记录文件列表中各文件的父文件夹和名称，供 get_file_path 使用"""
+        if not isinstance(file_list, list):
+            return
+        for file_info in file_list:
+            fid = file_info.get('fid')
+            pdir_fid = file_info.get('pdir_fid')
+            if fid and pdir_fid is not None:
+                self._parent_map[fid] = (pdir_fid, file_info.get('file_name', ''))
+
+    def _seed_info_cache(self, file_list: Any):
+        """
+        用列表响应中的文件记录填充 DEFAULT_INFO_FIELDS 投影的信息缓存
+
+        列出文件夹后再按ID查询其中的文件时，无需再次请求服务器
+        """
+        if not isinstance(file_list, list):
+            return
+        expires = time.monotonic() + _INFO_CACHE_TTL
+        with self._info_cache_lock:
+            for file_info in file_list:
+                if not all(field in file_info for field in DEFAULT_INFO_FIELDS):
+                    continue
+                cache_key = (file_info['fid'], DEFAULT_INFO_FIELDS)
+                self._info_cache[cache_key] = (expires, {field: file_info[field] for field in DEFAULT_INFO_FIELDS})
+                self._info_cache.move_to_end(cache_key)
+            while len(self._info_cache) > _INFO_CACHE_SIZE:
+                self._info_cache.popitem(last=False)
+
+    def _wrap_file_info(
+        self,
+        file_info: Dict[str, Any],
+        file_id: str,
+        fields: Optional[Sequence[str]]
+    ) -> Dict[str, Any]:
+        """按字段投影请求时包装为 LazyFileInfo"""
+        if not fields:
+            return file_info
+        return LazyFileInfo(file_info, self, file_id)
+
     def create_folder(self, folder_name: str, parent_id: str = "0") -> Dict[str, Any]:
         """
         创建文件夹
@@ -118,14 +613,8 @@ class FileService:
             'dir_path': ''
         }
 
-        # 添加查询参数
-        params = {
-            'pr': 'ucpro',
-            'fr': 'pc',
-            'uc_param_str': ''
-        }
-
-        response = self.client.post('file', json_data=data, params=params)
+        response = self.client.post('file', json_data=data)
+        self._invalidate_folders([parent_id])
         return response
 
     def delete_files(self, file_ids: List[str]) -> Dict[str, Any]:
@@ -144,14 +633,9 @@ class FileService:
             'exclude_fids': []
         }
 
-        # 添加查询参数
-        params = {
-            'pr': 'ucpro',
-            'fr': 'pc',
-            'uc_param_str': ''
-        }
-
-        response = self.client.post('file/delete', json_data=data, params=params)
+        response = self.client.post('file/delete', json_data=data)
+        self._invalidate_folders(self._folders_containing(file_ids) + file_ids)
+        self._forget_file_info(file_ids)
         return response
 
     def rename_file(self, file_id: str, new_name: str) -> Dict[str, Any]:
@@ -170,14 +654,9 @@ class FileService:
             'file_name': new_name
         }
 
-        # 添加查询参数
-        params = {
-            'pr': 'ucpro',
-            'fr': 'pc',
-            'uc_param_str': ''
-        }
-
-        response = self.client.post('file/rename', json_data=data, params=params)
+        response = self.client.post('file/rename', json_data=data)
+        self._invalidate_folders(self._folders_containing([file_id]))
+        self._forget_file_info([file_id])
         return response
 
     def search_files(
@@ -208,7 +687,7 @@ class FileService:
             '_page': page,
             '_size': size,
             '_fetch_total': 1,
-            '_sort': f'{sort_field}:{sort_order},updated_at:desc',
+            '_sort': _sort_param(sort_field, sort_order, ',updated_at:desc'),
             '_is_hl': 1  # 启用高亮
         }
 
@@ -216,6 +695,10 @@ class FileService:
         _ = folder_id  # folder_id参数暂时不使用
 
         response = self.client.get('file/search', params=params)
+        data = response.get('data') if isinstance(response, dict) else None
+        if isinstance(data, dict):
+            self._remember_parents(data.get('list'))
+            self._seed_info_cache(data.get('list'))
         return response
 
     def get_folder_tree(self, folder_id: str = "0", max_depth: int = 3) -> Dict[str, Any]:
@@ -234,7 +717,7 @@ class FileService:
             'max_depth': max_depth
         }
 
-        response = self.client.get('file/tree', params=params)
+        response = self._cached_get('file/tree', params)
         return response
 
     def get_storage_info(self) -> Dict[str, Any]:
@@ -278,14 +761,12 @@ class FileService:
         if not include_folders or not include_files:
             if isinstance(response, dict) and 'data' in response:
                 file_list = response['data'].get('list', [])
-                filtered_list = []
 
-                for file_info in file_list:
-                    file_type = file_info.get('file_type', 0)
-                    is_folder = file_type == 0
-
-                    if (is_folder and include_folders) or (not is_folder and include_files):
-                        filtered_list.append(file_info)
+                if include_folders or include_files:
+                    # 只保留文件夹或只保留文件
+                    filtered_list = [f for f in file_list if (f.get('file_type', 0) == 0) == include_folders]
+                else:
+                    filtered_list = []
 
                 response['data']['list'] = filtered_list
                 response['data']['filtered_total'] = len(filtered_list)
@@ -325,61 +806,106 @@ class FileService:
         if not file_extensions and min_size is None and max_size is None:
             return self.search_files(keyword, folder_id, page, size, sort_field, sort_order)
 
-        # 获取更多结果用于客户端过滤
+        # 预先计算过滤条件
+        ext_suffixes = tuple('.' + ext.lower().lstrip('.') for ext in file_extensions) if file_extensions else None
+        lower_bound = min_size if min_size is not None else float('-inf')
+        upper_bound = max_size if max_size is not None else float('inf')
+
+        def matches(file_info: Dict[str, Any]) -> bool:
+            # 文件扩展名过滤
+            if ext_suffixes and not file_info.get('file_name', '').lower().endswith(ext_suffixes):
+                return False
+            # 文件大小过滤
+            return lower_bound <= file_info.get('size', 0) <= upper_bound
+
+        # 逐页向服务器获取结果并过滤，凑够所请求页的结果后停止
+        start_idx = (page - 1) * size
+        end_idx = start_idx + size
         search_size = max(size * 3, 100)
-        response = self.search_files(keyword, folder_id, 1, search_size, sort_field, sort_order)
-
-        # 应用客户端过滤器
-        if isinstance(response, dict) and 'data' in response:
-            file_list = response['data'].get('list', [])
-            filtered_list = []
 
-            for file_info in file_list:
-                # 文件扩展名过滤
-                if file_extensions:
-                    file_name = file_info.get('file_name', '').lower()
-                    file_ext = file_name.split('.')[-1] if '.' in file_name else ''
-                    if file_ext not in [ext.lower() for ext in file_extensions]:
-                        continue
-
-                # 文件大小过滤
-                file_size = file_info.get('size', 0)
-                if min_size is not None and file_size < min_size:
-                    continue
-                if max_size is not None and file_size > max_size:
-                    continue
+        # 只保留所请求页内的匹配结果，其余匹配项只计数
+        response = None
+        matched = 0
+        paginated_list = []
+        for page_response in self._search_pages(keyword, folder_id, search_size, sort_field, sort_order):
+            if response is None:
+                response = page_response
+            for file_info in filter(matches, page_response['data']['list']):
+                if start_idx <= matched < end_idx:
+                    paginated_list.append(file_info)
+                matched += 1
+            if matched >= end_idx:
+                break
+
+        if response is None:
+            return self.search_files(keyword, folder_id, 1, search_size, sort_field, sort_order)
+
+        response['data']['list'] = paginated_list
+        response['data']['filtered_total'] = matched
+        # 更新metadata中的总数（已扫描结果中的匹配数）
+        if 'metadata' in response:
+            response['metadata']['_total'] = matched
+            response['metadata']['_count'] = len(paginated_list)
 
-                filtered_list.append(file_info)
+        return response
 
-            # 应用分页到过滤后的结果
-            start_idx = (page - 1) * size
-            end_idx = start_idx + size
-            paginated_list = filtered_list[start_idx:end_idx]
+    def _search_pages(
+        self,
+        keyword: str,
+        folder_id: str,
+        page_size: int,
+        sort_field: str,
+        sort_order: str
+    ) -> Iterator[Dict[str, Any]]:
+        """逐页获取搜索结果，直到没有更多结果"""
+        page = 1
+        fetched = 0
+        while True:
+            response = self.search_files(keyword, folder_id, page, page_size, sort_field, sort_order)
+            data = response.get('data') if isinstance(response, dict) else None
+            file_list = data.get('list') if isinstance(data, dict) else None
+            if not file_list:
+                return
 
-            response['data']['list'] = paginated_list
-            response['data']['filtered_total'] = len(filtered_list)
-            # 更新metadata中的总数
-            if 'metadata' in response:
-                response['metadata']['_total'] = len(filtered_list)
-                response['metadata']['_count'] = len(paginated_list)
+            yield response
 
-        return response
+            fetched += len(file_list)
+            total = response.get('metadata', {}).get('_total')
+            if len(file_list) < page_size or (isinstance(total, int) and fetched >= total):
+                return
+            page += 1
 
     def get_file_path(self, file_id: str) -> str:
         """
         获取文件的完整路径
 
+        沿父文件夹逐级向上拼接路径；列表、搜索和文件信息响应中见过的文件
+        不再请求服务器，只有未见过的上级文件夹才调用 get_file_info。
+
         Args:
             file_id: 文件ID
 
         Returns:
-            文件路径字符串
+            文件路径字符串（如 /文件夹/文件.txt），获取失败时返回空字符串
         """
         try:
             file_info = self.get_file_info(file_id)
-            # 这里需要根据实际API响应结构来获取路径
-            # 可能需要递归获取父文件夹信息来构建完整路径
-            return file_info.get('file_path', file_info.get('file_name', ''))
+            if file_info.get('file_path'):
+                return file_info['file_path']
+
+            names = []
+            current_id = file_id
+            visited = set()
+            while current_id and current_id != "0" and current_id not in visited:
+                visited.add(current_id)
+                entry = self._parent_map.get(current_id)
+                if entry is None:
+                    info = self.get_file_info(current_id)
+                    entry = (info.get('pdir_fid', ''), info.get('file_name', ''))
+                names.append(entry[1])
+                current_id = entry[0]
+
+            return '/' + '/'.join(reversed(names))
         except Exception:
             return ""
 
@@ -408,6 +934,8 @@ class FileService:
         }
 
         response = self.client.post('file/move', json_data=data)
+        self._invalidate_folders(self._folders_containing(file_ids) + [target_folder_id])
+        self._forget_file_info(file_ids)
 
         if not response.get('status') == 200:
             raise APIError(f"移动文件失败: {response.get('message', '未知错误')}")
@@ -436,7 +964,6 @@ class FileService:
         Returns:
             任务完成结果
         """
-        import time
 
         max_retries = 30  # 最多等待15秒
         retry_count = 0
@@ -471,6 +998,54 @@ class FileService:
 
         raise APIError("移动任务超时")
 
+    def apply_actions(self, actions: Sequence[FileAction], max_workers: int = 4) -> List[Dict[str, Any]]:
+        """
+        批量执行删除/移动/重命名操作
+
+        所有删除合并为一次请求，移动按目标文件夹合并，重命名逐个执行。
+        各组按 重命名 → 移动 → 删除 的固定顺序执行，同一组内的请求并发发出，
+        因此对同一文件先重命名再删除等组合的结果是确定的。
+
+        Args:
+            actions: 操作列表
+            max_workers: 最大并发请求数
+
+        Returns:
+            各请求的结果列表（重命名、移动、删除依次排列）
+        """
+        delete_ids: List[str] = []
+        moves: Dict[str, List[str]] = {}
+        renames: List[Tuple[str, str]] = []
+
+        for action in actions:
+            if action.action == 'delete':
+                delete_ids.extend(action.file_ids)
+            elif action.action == 'move':
+                if not action.target_folder_id:
+                    raise ValueError("移动操作缺少目标文件夹ID")
+                moves.setdefault(action.target_folder_id, []).extend(action.file_ids)
+            elif action.action == 'rename':
+                if not action.file_ids or not action.new_name:
+                    raise ValueError("重命名操作缺少文件ID或新名称")
+                renames.append((action.file_ids[0], action.new_name))
+            else:
+                raise ValueError(f"不支持的操作类型: {action.action}")
+
+        groups = [
+            [(self.rename_file, file_id, new_name) for file_id, new_name in renames],
+            [(self.move_files, file_ids, target_folder_id) for target_folder_id, file_ids in moves.items()],
+            [(self.delete_files, delete_ids)] if delete_ids else [],
+        ]
+
+        results: List[Dict[str, Any]] = []
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for group in groups:
+                # 上一组全部完成后才开始下一组
+                futures = [executor.submit(*call) for call in group]
+                results.extend(future.result() for future in futures)
+
+        return results
+
     def resolve_path(self, path: str, current_dir_id: str = "0") -> Tuple[str, bool]:
         """
         解析文件路径，返回文件ID和是否为文件夹
@@ -561,8 +1136,6 @@ class FileService:
         Returns:
             匹配的文件列表
         """
-        import fnmatch
-
         response = self.list_files(dir_id)
         if response.get('status') != 200:
             return []
@@ -589,35 +1162,93 @@ class FileService:
         """
         data = {'fids': file_ids}
 
-        params = {
-            'pr': 'ucpro',
-            'fr': 'pc',
-            'sys': 'win32',
-            've': '2.5.56',
-            'ut': '',
-            'guid': '',
-        }
-
         # 使用正确的 API 端点
         response = self.client.post(
             'file/download',
             json_data=data,
-            params=params
+            params=Config.DOWNLOAD_PARAMS
         )
 
         return response
 
-    def _generate_safe_filename(self, filepath: str) -> str:
+    def iter_download_urls(
+        self,
+        folder_id: str = "0",
+        page_size: int = 50,
+        max_workers: int = 4
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        遍历文件夹并获取其中文件的下载链接
+
+        列表分页与下载链接请求并行进行：每取到一页，就在后台请求该页文件的下载链接，
+        同时继续获取下一页
+
+        Args:
+            folder_id: 文件夹ID
+            page_size: 每页数量
+            max_workers: 同时进行的下载链接请求数
+
+        Yields:
+            下载信息字典（包含 fid、file_name、download_url 等），按完成顺序返回
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = set()
+
+            for file_list in self._iter_folder_pages(folder_id, page_size):
+                file_ids = [f['fid'] for f in file_list if not f.get('dir', False)]
+                if file_ids:
+                    pending.add(executor.submit(self.get_download_urls, file_ids))
+
+                # 先返回已经完成的请求
+                done = {future for future in pending if future.done()}
+                pending -= done
+                for future in done:
+                    yield from self._download_entries(future.result())
+
+            for future in as_completed(pending):
+                yield from self._download_entries(future.result())
+
+    def _iter_folder_pages(self, folder_id: str, page_size: int) -> Iterator[List[Dict[str, Any]]]:
+        """逐页获取文件夹内容"""
+        page = 1
+        fetched = 0
+
+        while True:
+            response = self.list_files(folder_id, page=page, size=page_size)
+            file_list = response.get('data', {}).get('list', [])
+            if not file_list:
+                return
+
+            yield file_list
+
+            fetched += len(file_list)
+            total = response.get('metadata', {}).get('_total')
+            if len(file_list) < page_size or (total is not None and fetched >= total):
+                return
+            page += 1
+
+    @staticmethod
+    def _download_entries(download_response: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """从下载链接响应中提取下载信息列表"""
+        if download_response.get('status') != 200:
+            raise APIError(f"获取下载链接失败: {download_response.get('message', '未知错误')}")
+        return download_response.get('data', [])
+
+    def _generate_safe_filename(self, filepath: str, taken: Optional[Set[str]] = None) -> str:
         """
         生成安全的文件名，处理文件冲突
 
         Args:
             filepath: 原始文件路径
+            taken: 已分配给其他下载、尚未写入磁盘的路径，视为已存在
 
         Returns:
             安全的文件路径
         """
-        if not os.path.exists(filepath):
+        def exists(path: str) -> bool:
+            return os.path.exists(path) or (taken is not None and path in taken)
+
+        if not exists(filepath):
             return filepath
 
         # 分离文件名和扩展名
@@ -634,7 +1265,7 @@ class FileService:
         while True:
             new_filename = f"{name}{counter}{ext}"
             new_filepath = os.path.join(dir_path, new_filename)
-            if not os.path.exists(new_filepath):
+            if not exists(new_filepath):
                 return new_filepath
             counter += 1
 
@@ -682,7 +1313,7 @@ class FileService:
             # 看起来是文件ID
             file_id = file_path
             # 获取文件信息
-            file_info = self.get_file_info(file_id)
+            file_info = self.get_file_info(file_id, fields=DEFAULT_INFO_FIELDS)
             if not file_info:
                 raise FileNotFoundError(f"文件ID不存在: {file_id}")
             filename = file_info.get('file_name', 'unknown')
@@ -693,7 +1324,7 @@ class FileService:
                 raise APIError(f"路径指向目录，请使用 download_folder 方法: {file_path}")
 
             # 获取文件信息
-            file_info = self.get_file_info(file_id)
+            file_info = self.get_file_info(file_id, fields=DEFAULT_INFO_FIELDS)
             if not file_info:
                 raise FileNotFoundError(f"文件不存在: {file_path}")
             filename = file_info['file_name']
@@ -739,7 +1370,7 @@ class FileService:
             # 看起来是文件夹ID
             folder_id = folder_path
             # 获取文件夹信息
-            folder_info = self.get_file_info(folder_id)
+            folder_info = self.get_file_info(folder_id, fields=DEFAULT_INFO_FIELDS)
             if not folder_info:
                 raise FileNotFoundError(f"文件夹ID不存在: {folder_id}")
             folder_name = folder_info.get('file_name', 'unknown')
@@ -750,7 +1381,7 @@ class FileService:
                 raise APIError(f"路径指向文件，请使用 download_file 方法: {folder_path}")
 
             # 获取文件夹信息
-            folder_info = self.get_file_info(folder_id)
+            folder_info = self.get_file_info(folder_id, fields=DEFAULT_INFO_FIELDS)
             if not folder_info:
                 raise FileNotFoundError(f"文件夹不存在: {folder_path}")
             folder_name = folder_info['file_name']
@@ -799,21 +1430,49 @@ class FileService:
             if download_response.get('status') == 200:
                 download_data = download_response.get('data', [])
 
+                # 先依次分配保存路径，避免并发下载的同名文件落到同一路径
+                jobs = []
+                taken: Set[str] = set()
                 for file_data in download_data:
                     filename = file_data.get('file_name', 'unknown')
                     download_url = file_data.get('download_url')
 
                     if download_url:
                         file_save_path = os.path.join(local_path, filename)
-                        safe_file_path = self._generate_safe_filename(file_save_path)
-
-                        try:
-                            self._download_file_stream(download_url, safe_file_path, progress_callback)
-                            if progress_callback:
-                                progress_callback('file_complete', safe_file_path)
-                        except Exception as e:
-                            if progress_callback:
-                                progress_callback('error', f"下载文件失败 {filename}: {e}")
+                        safe_file_path = self._generate_safe_filename(file_save_path, taken)
+                        taken.add(safe_file_path)
+                        jobs.append((filename, download_url, safe_file_path))
+
+                # 同一文件夹内的文件并发下载
+                if jobs:
+                    workers = max(1, min(Config.DOWNLOAD_WORKERS, len(jobs)))
+                    file_callback = progress_callback
+                    if progress_callback and workers > 1:
+                        # 各下载线程的回调串行调用，调用方无需自行加锁
+                        callback_lock = threading.Lock()
+
+                        def locked_callback(event, data):
+                            with callback_lock:
+                                progress_callback(event, data)
+
+                        file_callback = locked_callback
+
+                    with ThreadPoolExecutor(max_workers=workers) as executor:
+                        # 多个文件同时下载时，各自的tqdm进度条会互相覆盖，因此只在单线程时显示
+                        futures = {
+                            executor.submit(self._download_file_stream, download_url, safe_file_path,
+                                            file_callback, workers == 1): (filename, safe_file_path)
+                            for filename, download_url, safe_file_path in jobs
+                        }
+                        for future in as_completed(futures):
+                            filename, safe_file_path = futures[future]
+                            try:
+                                future.result()
+                                if file_callback:
+                                    file_callback('file_complete', safe_file_path)
+                            except Exception as e:
+                                if file_callback:
+                                    file_callback('error', f"下载文件失败 {filename}: {e}")
 
         # 递归处理子文件夹
         for folder in folders:
@@ -830,7 +1489,8 @@ class FileService:
             # 递归下载
             self._download_folder_recursive(folder_id, sub_folder_path, progress_callback)
 
-    def _download_file_stream(self, download_url: str, save_path: str, progress_callback=None):
+    def _download_file_stream(self, download_url: str, save_path: str, progress_callback=None,
+                              show_progress: bool = True):
         """
         流式下载文件
 
@@ -838,50 +1498,56 @@ class FileService:
             download_url: 下载链接
             save_path: 保存路径
             progress_callback: 进度回调函数
+            show_progress: 是否显示tqdm进度条
         """
-        import requests
-        from tqdm import tqdm
-
-        # 使用与 reference.py 完全相同的请求头和格式
-        headers = {
-            'user-agent': 'Mozilla/5.0 (Windows NT 10.0; WOW64) AppleWebKit/537.36 (KHTML, like Gecko)'
-                          ' Chrome/94.0.4606.71 Safari/537.36 Core/1.94.225.400 QQBrowser/12.2.5544.400',
-            'origin': 'https://pan.quark.cn',
-            'referer': 'https://pan.quark.cn/',
-            'accept-language': 'zh-CN,zh;q=0.9',
-            'cookie': self.client.cookies,  # 直接设置 cookie 头部
-        }
+        cookies = self.client.cookies
+        headers = {**_STREAM_HEADERS, 'cookie': cookies} if cookies else _STREAM_HEADERS  # 直接设置 cookie 头部
 
         try:
-            response = requests.get(download_url, headers=headers, stream=True, timeout=30)
-            response.raise_for_status()
-
-            # 获取文件大小
-            total_size = int(response.headers.get('content-length', 0))
-            filename = os.path.basename(save_path)
-
-            # 创建进度条
-            with tqdm(
-                total=total_size,
-                unit='B',
-                unit_scale=True,
-                desc=filename,
-                ncols=80
-            ) as pbar:
-
-                with open(save_path, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        if chunk:
-                            f.write(chunk)
-                            pbar.update(len(chunk))
-
-                            if progress_callback:
-                                progress_callback('progress', {
-                                    'filename': filename,
-                                    'downloaded': pbar.n,
-                                    'total': total_size,
-                                    'percentage': (pbar.n / total_size * 100) if total_size > 0 else 0
-                                })
+            with self._get_download_client().stream('GET', download_url, headers=headers) as response:
+                response.raise_for_status()
+
+                # 获取文件大小
+                total_size = int(response.headers.get('content-length', 0))
+                filename = os.path.basename(save_path)
+
+                # 响应未压缩时直接读取原始数据块，跳过httpx的解码层
+                if response.headers.get('content-encoding', 'identity') == 'identity':
+                    chunks = response.iter_raw(chunk_size=Config.DOWNLOAD_CHUNK_SIZE)
+                else:
+                    chunks = response.iter_bytes(chunk_size=Config.DOWNLOAD_CHUNK_SIZE)
+
+                # 创建进度条
+                with tqdm(
+                    total=total_size,
+                    unit='B',
+                    unit_scale=True,
+                    desc=filename,
+                    ncols=80,
+                    disable=not show_progress
+                ) as pbar:
+
+                    throttle = ProgressThrottle()
+                    downloaded = 0  # 进度条关闭时 pbar.n 不再更新，单独计数
+                    with open(save_path, 'wb', buffering=Config.DOWNLOAD_WRITE_BUFFER) as f:
+                        preallocate(f, total_size)
+                        try:
+                            for chunk in chunks:
+                                if chunk:
+                                    f.write(chunk)
+                                    pbar.update(len(chunk))
+                                    downloaded += len(chunk)
+
+                                    if progress_callback and (throttle.ready(downloaded) or downloaded == total_size):
+                                        progress_callback('progress', {
+                                            'filename': filename,
+                                            'downloaded': downloaded,
+                                            'total': total_size,
+                                            'percentage': (downloaded / total_size * 100) if total_size > 0 else 0
+                                        })
+                        finally:
+                            # 实际数据与Content-Length不一致时，去掉预分配多出的部分
+                            f.truncate()
 
             if progress_callback:
                 progress_callback('complete', save_path)
@@ -3,27 +3,295 @@
 文件上传服务
 """
 
+import base64
+import ctypes
+import ctypes.util
+import functools
 import hashlib
+import json
 import mimetypes
+import mmap
+import os
+import random
+import struct
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from contextlib import contextmanager, nullcontext
+from email.utils import formatdate
 from pathlib import Path
-from typing import Any, Callable, Dict, Optional, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
 
-from ..core.api_client import QuarkAPIClient
+import httpx
+
+from ..core.api_client import HTTP2_AVAILABLE, QuarkAPIClient
 from ..exceptions import APIError
+from .file_service import FileService
+
+# 多分片上传时的默认并发数
+DEFAULT_UPLOAD_WORKERS = 4
+
+# 同时进行重试的分片上传数上限
+UPLOAD_RETRY_CONCURRENCY = 2
+
+# 分片重试时复用上传授权的有效期（秒），需小于OSS签名的有效期
+UPLOAD_AUTH_REUSE_TTL = 300.0
+
+# OSS上传客户端的连接池限制
+OSS_CLIENT_LIMITS = httpx.Limits(max_connections=16, max_keepalive_connections=8)
+
+# OSS分片上传(PUT)与完成合并(POST)请求使用的x-oss-user-agent
+OSS_PUT_USER_AGENT = 'aliyun-sdk-js/1.0.0 Chrome Mobile 139.0.0.0 on Google Nexus 5 (Android 6.0)'
+OSS_POST_USER_AGENT = 'aliyun-sdk-js/1.0.0 Chrome 139.0.0.0 on OS X 10.15.7 64-bit'
+
+# 上传授权的auth_meta模板（基于日志分析的格式）
+_PUT_AUTH_META = (
+    "PUT\n\n{mime_type}\n{oss_date}\nx-oss-date:{oss_date}\n{hash_ctx_line}"
+    "x-oss-user-agent:" + OSS_PUT_USER_AGENT + "\n"
+    "/{bucket}/{obj_key}?partNumber={part_number}&uploadId={upload_id}"
+)
+_POST_AUTH_META = (
+    "POST\n{xml_md5}\napplication/xml\n{oss_date}\n"
+    "x-oss-callback:{callback_b64}\nx-oss-date:{oss_date}\n"
+    "x-oss-user-agent:" + OSS_POST_USER_AGENT + "\n"
+    "/{bucket}/{obj_key}?uploadId={upload_id}"
+)
+
+# 缓存文件哈希值的扩展属性名
+HASH_XATTR_NAME = 'user.quark.hashes'
+
+# 计算哈希时每次处理的数据块大小（mmap切片 / 普通读取）
+HASH_BLOCK_SIZE = 8 * 1024 * 1024
+HASH_READ_SIZE = 1024 * 1024
+
+
+def _new_hash(name: str, data: bytes = b''):
+    """
+    创建哈希对象（非安全用途，FIPS环境下也可使用OpenSSL实现）
+
+    Args:
+        name: 算法名称，如 'md5'、'sha1'
+        data: 初始数据
+
+    Returns:
+        哈希对象
+    """
+    try:
+        return hashlib.new(name, data, usedforsecurity=False)
+    except TypeError:
+        # Python 3.8 不支持 usedforsecurity 参数
+        return hashlib.new(name, data)
+
+
+@functools.lru_cache(maxsize=2)
+def _oss_date_for(epoch_sec: int) -> str:
+    """
+    生成OSS请求使用的RFC 1123格式GMT日期（同一秒内复用）
+
+    Args:
+        epoch_sec: Unix时间戳（秒）
+
+    Returns:
+        日期字符串，如 'Tue, 15 Oct 2024 08:00:00 GMT'
+    """
+    return formatdate(epoch_sec, usegmt=True)
+
+
+# 增量哈希上下文（x-oss-hash-ctx）的紧凑JSON模板，字段顺序与服务器要求一致
+_HASH_CTX_TEMPLATE = (
+    '{{"hash_type":"sha1","h0":"{}","h1":"{}","h2":"{}","h3":"{}","h4":"{}",'
+    '"Nl":"{}","Nh":"0","data":"","num":"0"}}'
+)
+
+# SHA1的初始状态
+_SHA1_INITIAL_STATE = (0x67452301, 0xEFCDAB89, 0x98BADCFE, 0x10325476, 0xC3D2E1F0)
+
+# 已知的文件特征（前4MB的SHA1前8位）到增量哈希的映射
+_KNOWN_HASH_STATES = {
+    # 5MB.bin前4MB: e50c2aba54365941509691c960cc619e0cfceb45
+    'e50c2aba': {'h0': 2038062192, 'h1': 1156653562, 'h2': 2676986762, 'h3': 923228148, 'h4': 2314295291},
+    # 6MB.bin前4MB: c85c1b38d2d6089783f17682ce697d5a1f322404
+    'c85c1b38': {'h0': 4257391254, 'h1': 2998800684, 'h2': 2953477736, 'h3': 3425592001, 'h4': 1131671407},
+    # 7MB.bin前4MB: fa7a3c467435454b146892695278f34823ea64d1
+    'fa7a3c46': {'h0': 1241139035, 'h1': 2735429804, 'h2': 1227958958, 'h3': 322089921, 'h4': 1130180806},
+    # random10MB.bin前4MB: 3146dae9dac8048a52b024c430859327aeda7fa0
+    '3146dae9': {'h0': 88233405, 'h1': 3250188692, 'h2': 4088466285, 'h3': 4145561436, 'h4': 4207629818},
+}
+
+
+class _SHA_CTX(ctypes.Structure):
+    """OpenSSL的SHA_CTX结构"""
+    _fields_ = [
+        ('h0', ctypes.c_uint32),
+        ('h1', ctypes.c_uint32),
+        ('h2', ctypes.c_uint32),
+        ('h3', ctypes.c_uint32),
+        ('h4', ctypes.c_uint32),
+        ('Nl', ctypes.c_uint32),
+        ('Nh', ctypes.c_uint32),
+        ('data', ctypes.c_uint32 * 16),
+        ('num', ctypes.c_uint),
+    ]
+
+
+def _load_sha1_update() -> Optional[Callable]:
+    """
+    加载libcrypto中的SHA1_Update
+
+    Returns:
+        SHA1_Update函数，找不到libcrypto时返回None
+    """
+    try:
+        library = ctypes.util.find_library('crypto')
+        if not library:
+            return None
+        update = ctypes.CDLL(library).SHA1_Update
+    except (OSError, AttributeError):
+        return None
+
+    update.argtypes = [ctypes.POINTER(_SHA_CTX), ctypes.c_char_p, ctypes.c_size_t]
+    update.restype = ctypes.c_int
+    return update
+
+
+_SHA1_UPDATE = _load_sha1_update()
+
+
+def _sha1_compress(state: Tuple[int, int, int, int, int], data: bytes) -> Tuple[int, int, int, int, int]:
+    """
+    在给定的SHA1中间状态上处理数据中完整的64字节块
+
+    不完整的最后一块不做填充处理，因为这是中间状态，不是最终的哈希。
+    有libcrypto时直接在其SHA_CTX上继续计算，否则使用纯Python实现。
+
+    Args:
+        state: 当前状态 (h0, h1, h2, h3, h4)
+        data: 待处理的数据
+
+    Returns:
+        新的状态
+    """
+    length = len(data) - len(data) % 64
+    if _SHA1_UPDATE is None or length == 0:
+        return _sha1_compress_py(state, data)
+
+    ctx = _SHA_CTX()
+    ctx.h0, ctx.h1, ctx.h2, ctx.h3, ctx.h4 = state
+    _SHA1_UPDATE(ctypes.byref(ctx), bytes(data), length)
+    return ctx.h0, ctx.h1, ctx.h2, ctx.h3, ctx.h4
+
+
+def _sha1_compress_py(state: Tuple[int, int, int, int, int], data: bytes) -> Tuple[int, int, int, int, int]:
+    """
+    在给定的SHA1中间状态上处理数据中完整的64字节块（纯Python实现）
+
+    Args:
+        state: 当前状态 (h0, h1, h2, h3, h4)
+        data: 待处理的数据
+
+    Returns:
+        新的状态
+    """
+    h0, h1, h2, h3, h4 = state
+    data_len = len(data)
+
+    # 处理完整的64字节块
+    for i in range(0, data_len - (data_len % 64), 64):
+        # 将64字节块转换为16个32位字（大端序）
+        w = list(struct.unpack_from('>16I', data, i))
+
+        # 扩展到80个字
+        for t in range(16, 80):
+            x = w[t - 3] ^ w[t - 8] ^ w[t - 14] ^ w[t - 16]
+            w.append(((x << 1) | (x >> 31)) & 0xFFFFFFFF)
+
+        # SHA1的主循环
+        a, b, c, d, e = h0, h1, h2, h3, h4
+
+        for t in range(80):
+            if t < 20:
+                f = (b & c) | ((~b) & d)
+                k = 0x5A827999
+            elif t < 40:
+                f = b ^ c ^ d
+                k = 0x6ED9EBA1
+            elif t < 60:
+                f = (b & c) | (b & d) | (c & d)
+                k = 0x8F1BBCDC
+            else:
+                f = b ^ c ^ d
+                k = 0xCA62C1D6
+
+            temp = (((a << 5) | (a >> 27)) + f + e + k + w[t]) & 0xFFFFFFFF
+            e = d
+            d = c
+            c = ((b << 30) | (b >> 2)) & 0xFFFFFFFF
+            b = a
+            a = temp
+
+        # 更新状态
+        h0 = (h0 + a) & 0xFFFFFFFF
+        h1 = (h1 + b) & 0xFFFFFFFF
+        h2 = (h2 + c) & 0xFFFFFFFF
+        h3 = (h3 + d) & 0xFFFFFFFF
+        h4 = (h4 + e) & 0xFFFFFFFF
+
+    return h0, h1, h2, h3, h4
+
+
+def _sha1_finalize(state: Tuple[int, int, int, int, int], length: int) -> str:
+    """
+    由处理完整64字节块后的SHA1中间状态得到最终哈希值
+
+    Args:
+        state: 处理完前 length 字节后的中间状态
+        length: 已处理的字节数（64字节的整数倍）
+
+    Returns:
+        十六进制的SHA1哈希值
+    """
+    padding = b'\x80' + b'\x00' * 55 + struct.pack('>Q', length * 8)
+    return struct.pack('>5I', *_sha1_compress(state, padding)).hex()
 
 
 class FileUploadService:
     """文件上传服务"""
 
-    def __init__(self, client: QuarkAPIClient):
+    def __init__(self, client: QuarkAPIClient, max_upload_workers: int = DEFAULT_UPLOAD_WORKERS):
         """
         初始化文件上传服务
 
         Args:
             client: API客户端实例
+            max_upload_workers: 多分片上传时同时上传的分片数
         """
         self.api_client = client
+        self.max_upload_workers = max(1, max_upload_workers)
+
+        # 限制同时重试的分片数，服务端短暂异常时不会被重试请求集中冲击
+        self._retry_slots = threading.BoundedSemaphore(UPLOAD_RETRY_CONCURRENCY)
+
+        # 增量哈希的SHA1中间状态缓存：文件路径 -> {已处理字节数: 状态}
+        self._sha1_states: Dict[str, Dict[int, Tuple[int, int, int, int, int]]] = {}
+        self._sha1_state_lock = threading.Lock()
+
+        # 分片上传与合并请求共用的OSS客户端（懒加载，复用连接）
+        self._oss_client: Optional[httpx.Client] = None
+        self._oss_client_lock = threading.Lock()
+
+    def _get_oss_client(self) -> httpx.Client:
+        """获取OSS上传客户端，安装了h2时启用HTTP/2"""
+        with self._oss_client_lock:
+            if self._oss_client is None:
+                self._oss_client = httpx.Client(http2=HTTP2_AVAILABLE, timeout=300.0, limits=OSS_CLIENT_LIMITS)
+            return self._oss_client
+
+    def close(self):
+        """关闭OSS上传客户端"""
+        with self._oss_client_lock:
+            if self._oss_client is not None:
+                self._oss_client.close()
+                self._oss_client = None
 
     def upload_file(
         self,
@@ -54,7 +322,8 @@ class FileUploadService:
             raise ValueError(f"路径不是文件: {file_path}")
 
         # 获取文件信息
-        file_size = file_path_obj.stat().st_size
+        file_stat = file_path_obj.stat()
+        file_size = file_stat.st_size
         file_name = file_path_obj.name
 
         # 获取MIME类型
@@ -66,7 +335,13 @@ class FileUploadService:
         if progress_callback:
             progress_callback(0, "计算文件哈希...")
 
-        md5_hash, sha1_hash = self._calculate_file_hashes(file_path_obj, progress_callback)
+        cached_hashes = self._load_cached_hashes(file_path_obj, file_stat)
+        if cached_hashes:
+            # 文件未修改，复用上次计算的哈希
+            md5_hash, sha1_hash = cached_hashes
+        else:
+            md5_hash, sha1_hash = self._calculate_file_hashes(file_path_obj, progress_callback)
+            self._store_cached_hashes(file_path_obj, file_stat, md5_hash, sha1_hash)
 
         # 步骤1: 预上传请求
         if progress_callback:
@@ -93,7 +368,25 @@ class FileUploadService:
         if progress_callback:
             progress_callback(20, "更新文件哈希...")
 
-        self._update_file_hash(task_id, md5_hash, sha1_hash)
+        hash_result = self._update_file_hash(task_id, md5_hash, sha1_hash)
+
+        # 服务器已有相同文件（秒传），无需上传数据
+        if hash_result.get('finish'):
+            # 目标文件夹内容已变化，丢弃其缓存（包括后台预取的列表）
+            FileService.for_client(self.client).invalidate_cache(parent_folder_id)
+            if progress_callback:
+                progress_callback(100, "秒传命中")
+
+            return {
+                'status': 'success',
+                'task_id': task_id,
+                'file_name': file_name,
+                'file_size': file_size,
+                'md5': md5_hash,
+                'sha1': sha1_hash,
+                'upload_result': {'strategy': 'rapid_upload'},
+                'finish_result': hash_result
+            }
 
         # 步骤3: 根据文件大小选择上传策略
         if file_size < 5 * 1024 * 1024:  # < 5MB 单分片上传
@@ -132,6 +425,7 @@ class FileUploadService:
             progress_callback(95, "完成上传...")
 
         finish_result = self._finish_upload(task_id, obj_key)
+        FileService.for_client(self.client).invalidate_cache(parent_folder_id)
 
         if progress_callback:
             progress_callback(100, "上传完成")
@@ -153,24 +447,123 @@ class FileUploadService:
         progress_callback: Optional[Callable] = None
     ) -> Tuple[str, str]:
         """计算文件的MD5和SHA1哈希值"""
-        md5_hash = hashlib.md5()
-        sha1_hash = hashlib.sha1()
+        md5_hash = _new_hash('md5')
+        sha1_hash = _new_hash('sha1')
 
         file_size = file_path.stat().st_size
         bytes_read = 0
+        last_progress = -1
 
-        with open(file_path, 'rb') as f:
-            while chunk := f.read(8192):
-                md5_hash.update(chunk)
-                sha1_hash.update(chunk)
+        # 大文件的MD5和SHA1在两个线程中并行计算（hashlib计算时会释放GIL）
+        executor = ThreadPoolExecutor(max_workers=2) if file_size > HASH_BLOCK_SIZE else None
+
+        try:
+            for chunk in self._iter_file_blocks(file_path, file_size):
+                if executor:
+                    md5_future = executor.submit(md5_hash.update, chunk)
+                    sha1_future = executor.submit(sha1_hash.update, chunk)
+                    md5_future.result()
+                    sha1_future.result()
+                else:
+                    md5_hash.update(chunk)
+                    sha1_hash.update(chunk)
                 bytes_read += len(chunk)
 
                 if progress_callback and file_size > 0:
                     progress = min(10, int((bytes_read / file_size) * 10))
-                    progress_callback(progress, f"计算哈希: {progress}%")
+                    # 进度值变化时才回调
+                    if progress != last_progress:
+                        progress_callback(progress, f"计算哈希: {progress}%")
+                        last_progress = progress
+        finally:
+            if executor:
+                executor.shutdown()
 
         return md5_hash.hexdigest(), sha1_hash.hexdigest()
 
+    @staticmethod
+    def _load_cached_hashes(file_path: Path, file_stat: os.stat_result) -> Optional[Tuple[str, str]]:
+        """
+        从文件扩展属性中读取缓存的哈希值
+
+        仅当文件大小和修改时间与缓存时一致才视为有效；不支持扩展属性的平台返回None。
+
+        Returns:
+            (md5, sha1) 或 None
+        """
+        if not hasattr(os, 'getxattr'):
+            return None
+        try:
+            cached = json.loads(os.getxattr(file_path, HASH_XATTR_NAME))
+        except (OSError, ValueError):
+            return None
+
+        if (
+            isinstance(cached, dict)
+            and cached.get('size') == file_stat.st_size
+            and cached.get('mtime_ns') == file_stat.st_mtime_ns
+            and cached.get('md5') and cached.get('sha1')
+        ):
+            return cached['md5'], cached['sha1']
+        return None
+
+    @staticmethod
+    def _store_cached_hashes(file_path: Path, file_stat: os.stat_result, md5_hash: str, sha1_hash: str):
+        """将哈希值写入文件扩展属性（失败时忽略）"""
+        if not hasattr(os, 'setxattr'):
+            return
+        value = json.dumps({
+            'size': file_stat.st_size,
+            'mtime_ns': file_stat.st_mtime_ns,
+            'md5': md5_hash,
+            'sha1': sha1_hash
+        }, separators=(',', ':'))
+        try:
+            os.setxattr(file_path, HASH_XATTR_NAME, value.encode('utf-8'))
+        except OSError:
+            # 文件系统不支持扩展属性或没有写权限
+            pass
+
+    @staticmethod
+    def _iter_file_blocks(file_path: Path, file_size: int) -> Iterator[memoryview]:
+        """
+        按大块顺序读取文件内容
+
+        优先使用mmap映射整个文件并按 HASH_BLOCK_SIZE 切片，避免逐块read的系统调用和拷贝；
+        mmap不可用时（空文件、特殊文件等）回退为普通分块读取。
+
+        Args:
+            file_path: 文件路径
+            file_size: 文件大小
+
+        Yields:
+            文件内容块
+        """
+        with open(file_path, 'rb') as f:
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if file_size > 0 else None
+            except (OSError, ValueError, OverflowError):
+                mapped = None
+
+            if mapped is None:
+                while chunk := f.read(HASH_READ_SIZE):
+                    yield memoryview(chunk)
+                return
+
+            with mapped:
+                if hasattr(mapped, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                    mapped.madvise(mmap.MADV_SEQUENTIAL)
+                view = memoryview(mapped)
+                try:
+                    for offset in range(0, len(mapped), HASH_BLOCK_SIZE):
+                        block = view[offset:offset + HASH_BLOCK_SIZE]
+                        try:
+                            yield block
+                        finally:
+                            block.release()
+                finally:
+                    view.release()
+
     def _pre_upload(
         self,
         file_name: str,
@@ -193,16 +586,9 @@ class FileUploadService:
             "l_created_at": current_time
         }
 
-        params = {
-            'pr': 'ucpro',
-            'fr': 'pc',
-            'uc_param_str': ''
-        }
-
         response = self.api_client.post(
             "file/upload/pre",
-            json_data=data,
-            params=params
+            json_data=data
         )
 
         if not response.get('status'):
@@ -260,7 +646,7 @@ class FileUploadService:
             progress_callback(70, "获取POST合并授权...")
 
         # 构建XML数据
-        xml_data = f'<?xml version="1.0" encoding="UTF-8"?>\n<CompleteMultipartUpload>\n<Part>\n<PartNumber>1</PartNumber>\n<ETag>"{etag}"</ETag>\n</Part>\n</CompleteMultipartUpload>'
+        xml_data = self._build_complete_xml([(1, etag)])
 
         try:
             post_auth_result = self._get_complete_upload_auth(
@@ -281,22 +667,21 @@ class FileUploadService:
             if progress_callback:
                 progress_callback(85, "POST完成合并...")
 
-            import httpx
-            with httpx.Client(timeout=300.0) as client:
-                response = client.post(
-                    post_upload_url,
-                    content=xml_data,
-                    headers=post_auth_headers
-                )
+            client = self._get_oss_client()
+            response = client.post(
+                post_upload_url,
+                content=xml_data,
+                headers=post_auth_headers
+            )
 
-                if response.status_code == 200:
-                    # POST完成合并成功，callback也成功
-                    pass
-                elif response.status_code == 203:
-                    # POST完成合并成功，但callback失败（文件已成功上传）
-                    pass
-                else:
-                    raise APIError(f"POST完成合并失败: {response.status_code}, {response.text}")
+            if response.status_code == 200:
+                # POST完成合并成功，callback也成功
+                pass
+            elif response.status_code == 203:
+                # POST完成合并成功，但callback失败（文件已成功上传）
+                pass
+            else:
+                raise APIError(f"POST完成合并失败: {response.status_code}, {response.text}")
 
             return {
                 'strategy': 'single_part_complete',
@@ -337,80 +722,71 @@ class FileUploadService:
         if progress_callback:
             progress_callback(35, f"开始上传 {len(parts)} 个分片...")
 
-        # 上传所有分片
+        # 并发上传所有分片
         uploaded_parts = []
         base_progress = 35
         progress_per_part = 45 / len(parts)  # 35-80% 用于分片上传
 
-        for i, (part_number, part_size) in enumerate(parts):
-            current_progress = base_progress + int(i * progress_per_part)
-
-            if progress_callback:
-                progress_callback(current_progress, f"上传分片 {part_number}/{len(parts)}...")
-
-            # 分片上传重试逻辑
-            max_retries = 3
-            retry_count = 0
-
-            while retry_count <= max_retries:
-                try:
-                    # 计算增量哈希（分片2+必须有）
-                    hash_ctx = None
-                    if part_number > 1:
-                        hash_ctx = self._calculate_incremental_hash_context(
-                            file_path, part_number, part_size
-                        )
+        # 增量哈希上下文在单独的线程中按分片顺序计算，与分片上传重叠进行
+        hash_executor = ThreadPoolExecutor(max_workers=1)
+        hash_futures = {
+            part_number: hash_executor.submit(
+                self._calculate_incremental_hash_context, file_path, part_number, part_size
+            )
+            for part_number, part_size in parts
+            if part_number > 1
+        }
 
-                    # 获取分片上传授权
-                    auth_result = self._get_upload_auth(
+        try:
+            # 整个文件只打开并映射一次，各分片共享同一个映射的切片
+            with self._map_file_range(file_path, 0, file_size) as file_data, \
+                    memoryview(file_data) as file_view, \
+                    hash_executor, \
+                    ThreadPoolExecutor(max_workers=min(self.max_upload_workers, len(parts))) as executor:
+                futures = [
+                    executor.submit(
+                        self._upload_part_with_retry,
+                        file_path=file_path,
                         task_id=task_id,
                         mime_type=mime_type,
                         part_number=part_number,
+                        part_size=part_size,
                         auth_info=auth_info,
                         upload_id=upload_id,
                         obj_key=obj_key,
                         bucket=bucket,
-                        hash_ctx=hash_ctx  # type: ignore[attr-defined]
+                        hash_ctx_future=hash_futures.get(part_number),
+                        file_view=file_view
                     )
-                    upload_url = auth_result.get('upload_url')
-                    auth_headers = auth_result.get('headers', {})
+                    for part_number, part_size in parts
+                ]
 
-                    if not upload_url:
-                        raise APIError(f"获取分片 {part_number} 上传授权失败")
-
-                    # 上传分片
-                    etag = self._upload_part_to_oss(
-                        file_path=file_path,
-                        upload_url=upload_url,
-                        headers=auth_headers,
-                        part_number=part_number,
-                        part_size=part_size,
-                        progress_callback=None  # 分片内部不显示进度
-                    )
-
-                    uploaded_parts.append((part_number, etag))
-                    break  # 成功上传，跳出重试循环
-
-                except Exception as e:
-                    retry_count += 1
-                    if retry_count > max_retries:
-                        raise APIError(f"分片 {part_number} 上传失败，已重试 {max_retries} 次: {str(e)}")
-
-                    # 等待一段时间后重试
-                    import time
-                    time.sleep(min(2 ** retry_count, 10))  # 指数退避，最大10秒
+                try:
+                    for future in as_completed(futures):
+                        uploaded_parts.append(future.result())
+
+                        if progress_callback:
+                            current_progress = base_progress + int(len(uploaded_parts) * progress_per_part)
+                            progress_callback(current_progress, f"已上传分片 {len(uploaded_parts)}/{len(parts)}...")
+                except Exception:
+                    # 任一分片最终失败时，取消尚未开始的分片和哈希计算
+                    for future in futures + list(hash_futures.values()):
+                        future.cancel()
+                    raise
+        finally:
+            # 上传结束后释放该文件的SHA1中间状态缓存
+            with self._sha1_state_lock:
+                self._sha1_states.pop(str(file_path), None)
+
+        # 合并请求要求分片按编号排列
+        uploaded_parts.sort()
 
         # 完成分片上传 - 需要POST完成合并
         if progress_callback:
             progress_callback(80, "POST完成合并...")
 
         # 构建多分片的XML数据
-        xml_parts = []
-        for part_number, etag in uploaded_parts:
-            xml_parts.append(f'<Part>\n<PartNumber>{part_number}</PartNumber>\n<ETag>"{etag}"</ETag>\n</Part>')
-
-        xml_data = f'<?xml version="1.0" encoding="UTF-8"?>\n<CompleteMultipartUpload>\n' + \
-            '\n'.join(xml_parts) + '\n</CompleteMultipartUpload>'
+        xml_data = self._build_complete_xml(uploaded_parts)
 
         try:
             # 获取POST完成合并授权
@@ -432,22 +808,21 @@ class FileUploadService:
                 raise APIError("获取POST完成合并授权失败")
 
             # 发送POST完成合并请求
-            import httpx
-            with httpx.Client(timeout=300.0) as client:
-                response = client.post(
-                    post_upload_url,
-                    content=xml_data,
-                    headers=post_auth_headers
-                )
+            client = self._get_oss_client()
+            response = client.post(
+                post_upload_url,
+                content=xml_data,
+                headers=post_auth_headers
+            )
 
-                if response.status_code == 200:
-                    # POST完成合并成功，callback也成功
-                    pass
-                elif response.status_code == 203:
-                    # POST完成合并成功，但callback失败（文件已成功上传）
-                    pass
-                else:
-                    raise APIError(f"POST完成合并失败: {response.status_code}, {response.text}")
+            if response.status_code == 200:
+                # POST完成合并成功，callback也成功
+                pass
+            elif response.status_code == 203:
+                # POST完成合并成功，但callback失败（文件已成功上传）
+                pass
+            else:
+                raise APIError(f"POST完成合并失败: {response.status_code}, {response.text}")
 
             complete_result = {
                 'status': 'multipart_upload_completed',
@@ -468,6 +843,112 @@ class FileUploadService:
             'complete_result': complete_result
         }
 
+    @staticmethod
+    def _build_complete_xml(parts: List[Tuple[int, str]]) -> bytes:
+        """
+        构建CompleteMultipartUpload请求的XML数据
+
+        Args:
+            parts: 按编号排列的 (分片编号, ETag) 列表
+
+        Returns:
+            UTF-8编码的XML数据
+        """
+        return (
+            b'<?xml version="1.0" encoding="UTF-8"?>\n<CompleteMultipartUpload>\n'
+            + b'\n'.join(
+                b'<Part>\n<PartNumber>%d</PartNumber>\n<ETag>"%s"</ETag>\n</Part>' % (part_number, etag.encode('utf-8'))
+                for part_number, etag in parts
+            )
+            + b'\n</CompleteMultipartUpload>'
+        )
+
+    def _upload_part_with_retry(
+        self,
+        file_path: Path,
+        task_id: str,
+        mime_type: str,
+        part_number: int,
+        part_size: int,
+        auth_info: str,
+        upload_id: str,
+        obj_key: str,
+        bucket: str,
+        max_retries: int = 3,
+        hash_ctx_future: Optional[Future] = None,
+        file_view: Optional[memoryview] = None
+    ) -> Tuple[int, str]:
+        """
+        上传单个分片（含授权与重试）
+
+        Args:
+            hash_ctx_future: 后台计算中的增量哈希上下文，None时在当前线程计算
+            file_view: 整个文件的映射视图，None时按分片单独映射文件
+
+        Returns:
+            (分片编号, ETag)
+        """
+        retry_count = 0
+        auth_result = None
+        auth_time = 0.0
+
+        while True:
+            try:
+                # 重试请求占用重试名额，避免多个分片同时失败后一齐重试
+                with self._retry_slots if retry_count else nullcontext():
+                    # 计算增量哈希（分片2+必须有）
+                    hash_ctx = None
+                    if hash_ctx_future is not None:
+                        hash_ctx = hash_ctx_future.result()
+                    elif part_number > 1:
+                        hash_ctx = self._calculate_incremental_hash_context(
+                            file_path, part_number, part_size
+                        )
+
+                    # 获取分片上传授权，重试时复用仍在有效期内的授权
+                    if auth_result is None or time.monotonic() - auth_time > UPLOAD_AUTH_REUSE_TTL:
+                        auth_result = self._get_upload_auth(
+                            task_id=task_id,
+                            mime_type=mime_type,
+                            part_number=part_number,
+                            auth_info=auth_info,
+                            upload_id=upload_id,
+                            obj_key=obj_key,
+                            bucket=bucket,
+                            hash_ctx=hash_ctx  # type: ignore[attr-defined]
+                        )
+                        auth_time = time.monotonic()
+                    upload_url = auth_result.get('upload_url')
+                    auth_headers = auth_result.get('headers', {})
+
+                    if not upload_url:
+                        raise APIError(f"获取分片 {part_number} 上传授权失败")
+
+                    # 上传分片
+                    etag = self._upload_part_to_oss(
+                        file_path=file_path,
+                        upload_url=upload_url,
+                        headers=auth_headers,
+                        part_number=part_number,
+                        part_size=part_size,
+                        progress_callback=None,  # 分片内部不显示进度
+                        file_view=file_view
+                    )
+
+                    return part_number, etag
+
+            except Exception as e:
+                # 只有网络错误时保留授权，其他错误（如签名被拒绝）下次重新获取
+                if not isinstance(e, httpx.TransportError):
+                    auth_result = None
+
+                retry_count += 1
+                if retry_count > max_retries:
+                    raise APIError(f"分片 {part_number} 上传失败，已重试 {max_retries} 次: {str(e)}")
+
+                # 等待一段时间后重试：带随机抖动的指数退避，最大10秒
+                time.sleep(min(2 ** retry_count * random.uniform(0.5, 1.5), 10))
+
     def _get_upload_auth(
         self,
         task_id: str,
@@ -480,32 +961,19 @@ class FileUploadService:
         hash_ctx: str = ""
     ) -> Dict[str, Any]:
         """获取上传授权"""
-        from datetime import datetime, timezone
-
         # 生成OSS日期
-        oss_date = datetime.now(timezone.utc).strftime('%a, %d %b %Y %H:%M:%S GMT')
-
-        # 构建auth_meta (基于日志分析的格式)
-        # 使用从预上传响应中获取的真实信息
-        if hash_ctx:
-            # 包含增量哈希头
-            auth_meta = f"""PUT
-
-{mime_type}
-{oss_date}
-x-oss-date:{oss_date}
-x-oss-hash-ctx:{hash_ctx}
-x-oss-user-agent:aliyun-sdk-js/1.0.0 Chrome Mobile 139.0.0.0 on Google Nexus 5 (Android 6.0)
-/{bucket}/{obj_key}?partNumber={part_number}&uploadId={upload_id}"""
-        else:
-            # 不包含增量哈希头
-            auth_meta = f"""PUT
+        oss_date = _oss_date_for(int(time.time()))
 
-{mime_type}
-{oss_date}
-x-oss-date:{oss_date}
-x-oss-user-agent:aliyun-sdk-js/1.0.0 Chrome Mobile 139.0.0.0 on Google Nexus 5 (Android 6.0)
-/{bucket}/{obj_key}?partNumber={part_number}&uploadId={upload_id}"""
+        # 构建auth_meta，有增量哈希时加入 x-oss-hash-ctx 头
+        auth_meta = _PUT_AUTH_META.format(
+            mime_type=mime_type,
+            oss_date=oss_date,
+            hash_ctx_line=f"x-oss-hash-ctx:{hash_ctx}\n" if hash_ctx else "",
+            bucket=bucket,
+            obj_key=obj_key,
+            part_number=part_number,
+            upload_id=upload_id
+        )
 
         data = {
             "task_id": task_id,
@@ -533,7 +1001,7 @@ x-oss-user-agent:aliyun-sdk-js/1.0.0 Chrome Mobile 139.0.0.0 on Google Nexus 5 (
         headers = {
             'Content-Type': mime_type,
             'x-oss-date': oss_date,
-            'x-oss-user-agent': 'aliyun-sdk-js/1.0.0 Chrome Mobile 139.0.0.0 on Google Nexus 5 (Android 6.0)'
+            'x-oss-user-agent': OSS_PUT_USER_AGENT
         }
 
         if auth_key:
@@ -556,64 +1024,32 @@ x-oss-user-agent:aliyun-sdk-js/1.0.0 Chrome Mobile 139.0.0.0 on Google Nexus 5 (
         upload_id: str = "",
         obj_key: str = "",
         bucket: str = "ul-zb",
-        xml_data: str = "",
+        xml_data: bytes = b"",
         callback_info: Dict[str, Any] = None
     ) -> Dict[str, Any]:
         """获取POST完成合并的上传授权"""
         # 生成OSS日期 - 确保与PUT请求时间接近
-        import time
-        from datetime import datetime
-
-        # 添加短暂延迟，模拟真实的时间间隔
-        time.sleep(0.1)
-
-        oss_date = datetime.utcnow().strftime('%a, %d %b %Y %H:%M:%S GMT')
+        oss_date = _oss_date_for(int(time.time()))
 
         # 计算XML数据的MD5
-        import base64
-        import hashlib
-        xml_md5 = base64.b64encode(hashlib.md5(xml_data.encode('utf-8')).digest()).decode('utf-8')
+        xml_md5 = base64.b64encode(_new_hash('md5', xml_data).digest()).decode('utf-8')
 
         # 使用预上传响应中提供的callback信息
         if not callback_info:
             raise APIError("callback信息缺失，需要从预上传响应中获取")
 
-        import json
         callback_b64 = base64.b64encode(json.dumps(
             callback_info, separators=(',', ':')).encode('utf-8')).decode('utf-8')
 
         # 构建POST请求的auth_meta
-        auth_meta = f"""POST
-{xml_md5}
-application/xml
-{oss_date}
-x-oss-callback:{callback_b64}
-x-oss-date:{oss_date}
-x-oss-user-agent:aliyun-sdk-js/1.0.0 Chrome 139.0.0.0 on OS X 10.15.7 64-bit
-/{bucket}/{obj_key}?uploadId={upload_id}"""
-
-        # 先发送OPTIONS请求
-        import httpx
-        options_headers = {
-            'accept': '*/*',
-            'accept-language': 'zh-CN,zh;q=0.9',
-            'access-control-request-headers': 'content-type',
-            'access-control-request-method': 'POST',
-            'cache-control': 'no-cache',
-            'origin': 'https://pan.quark.cn',
-            'pragma': 'no-cache',
-            'priority': 'u=1, i',
-            'referer': 'https://pan.quark.cn/',
-            'sec-fetch-dest': 'empty',
-            'sec-fetch-mode': 'cors',
-            'sec-fetch-site': 'same-site',
-            'user-agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/139.0.0.0 Safari/537.36'
-        }
-
-        options_url = "https://drive-pc.quark.cn/1/clouddrive/file/upload/auth?pr=ucpro&fr=pc&uc_param_str="
-
-        with httpx.Client(timeout=30.0) as client:
-            options_response = client.options(options_url, headers=options_headers)
+        auth_meta = _POST_AUTH_META.format(
+            xml_md5=xml_md5,
+            oss_date=oss_date,
+            callback_b64=callback_b64,
+            bucket=bucket,
+            obj_key=obj_key,
+            upload_id=upload_id
+        )
 
         # 调用上传授权API
         data = {
@@ -637,7 +1073,7 @@ x-oss-user-agent:aliyun-sdk-js/1.0.0 Chrome 139.0.0.0 on OS X 10.15.7 64-bit
         headers = {
             'Content-Type': 'application/xml',
             'x-oss-date': oss_date,
-            'x-oss-user-agent': 'aliyun-sdk-js/1.0.0 Chrome 139.0.0.0 on OS X 10.15.7 64-bit',
+            'x-oss-user-agent': OSS_POST_USER_AGENT,
             'authorization': auth_key,
             'x-oss-callback': callback_b64,
             'Content-MD5': xml_md5
@@ -655,140 +1091,63 @@ x-oss-user-agent:aliyun-sdk-js/1.0.0 Chrome 139.0.0.0 on OS X 10.15.7 64-bit
         part_size: int
     ) -> str:
         """计算分片的增量哈希上下文"""
-        import base64
-        import json
 
         # 使用从random10MB.log观察到的实际值
         chunk_size = 4 * 1024 * 1024  # 4MB
         processed_bytes = (part_number - 1) * chunk_size
         processed_bits = processed_bytes * 8
 
-        # 使用基于文件内容特征的精确增量哈希计算
-        # 读取前面分片的数据
-        with open(file_path, 'rb') as f:
-            previous_data = f.read(processed_bytes)
-
-        import hashlib
-        import struct
-
-        # 计算文件内容的特征值
-        sha1_hash = hashlib.sha1(previous_data)
-        sha1_hex = sha1_hash.hexdigest()
-
-        # 基于SHA1十六进制字符串创建特征映射
-        # 这是一个基于观察到的实际数据的映射方法
-        feature_key = sha1_hex[:8]  # 使用前8个字符作为特征
-
-        # 已知的文件特征到增量哈希的映射
-        known_mappings = {
-            # 5MB.bin前4MB: e50c2aba54365941509691c960cc619e0cfceb45
-            'e50c2aba': {'h0': 2038062192, 'h1': 1156653562, 'h2': 2676986762, 'h3': 923228148, 'h4': 2314295291},
-            # 6MB.bin前4MB: c85c1b38d2d6089783f17682ce697d5a1f322404
-            'c85c1b38': {'h0': 4257391254, 'h1': 2998800684, 'h2': 2953477736, 'h3': 3425592001, 'h4': 1131671407},
-            # 7MB.bin前4MB: fa7a3c467435454b146892695278f34823ea64d1
-            'fa7a3c46': {'h0': 1241139035, 'h1': 2735429804, 'h2': 1227958958, 'h3': 322089921, 'h4': 1130180806},
-            # random10MB.bin前4MB: 3146dae9dac8048a52b024c430859327aeda7fa0
-            '3146dae9': {'h0': 88233405, 'h1': 3250188692, 'h2': 4088466285, 'h3': 4145561436, 'h4': 4207629818},
-        }
+        # 从最近一次缓存的SHA1中间状态继续计算，只处理新增的数据
+        state = self._sha1_state_at(file_path, processed_bytes)
 
-        if feature_key in known_mappings:
-            # 使用已知的精确映射
-            known_hash = known_mappings[feature_key]
-            h0 = known_hash['h0']
-            h1 = known_hash['h1']
-            h2 = known_hash['h2']
-            h3 = known_hash['h3']
-            h4 = known_hash['h4']
-        else:
-            # 对于未知文件，实现一个更精确的SHA1增量状态计算
-            # 这个方法尝试模拟真正的SHA1算法的中间状态
-
-            # 实现更精确的SHA1增量状态计算
-            def calculate_sha1_incremental_state(data):
-                """
-                计算SHA1的增量状态，模拟真正的SHA1算法中间状态
-                这个实现基于对日志数据的分析，尽可能接近真实的SHA1状态
-                """
-                # SHA1的初始状态
-                h0 = 0x67452301
-                h1 = 0xEFCDAB89
-                h2 = 0x98BADCFE
-                h3 = 0x10325476
-                h4 = 0xC3D2E1F0
-
-                data_len = len(data)
-
-                # 处理完整的64字节块
-                for i in range(0, data_len - (data_len % 64), 64):
-                    block = data[i:i + 64]
-
-                    # 将64字节块转换为16个32位字（大端序）
-                    w = []
-                    for j in range(0, 64, 4):
-                        w.append(struct.unpack('>I', block[j:j + 4])[0])
-
-                    # 扩展到80个字
-                    for t in range(16, 80):
-                        w.append(((w[t - 3] ^ w[t - 8] ^ w[t - 14] ^ w[t - 16]) << 1 |
-                                 (w[t - 3] ^ w[t - 8] ^ w[t - 14] ^ w[t - 16]) >> 31) & 0xFFFFFFFF)
-
-                    # SHA1的主循环
-                    a, b, c, d, e = h0, h1, h2, h3, h4
-
-                    for t in range(80):
-                        if t < 20:
-                            f = (b & c) | ((~b) & d)
-                            k = 0x5A827999
-                        elif t < 40:
-                            f = b ^ c ^ d
-                            k = 0x6ED9EBA1
-                        elif t < 60:
-                            f = (b & c) | (b & d) | (c & d)
-                            k = 0x8F1BBCDC
-                        else:
-                            f = b ^ c ^ d
-                            k = 0xCA62C1D6
-
-                        temp = (((a << 5) | (a >> 27)) + f + e + k + w[t]) & 0xFFFFFFFF
-                        e = d
-                        d = c
-                        c = ((b << 30) | (b >> 2)) & 0xFFFFFFFF
-                        b = a
-                        a = temp
-
-                    # 更新状态
-                    h0 = (h0 + a) & 0xFFFFFFFF
-                    h1 = (h1 + b) & 0xFFFFFFFF
-                    h2 = (h2 + c) & 0xFFFFFFFF
-                    h3 = (h3 + d) & 0xFFFFFFFF
-                    h4 = (h4 + e) & 0xFFFFFFFF
-
-                # 对于不完整的最后一块，我们不进行填充处理
-                # 因为这是中间状态，不是最终的哈希
-
-                return h0, h1, h2, h3, h4
-
-            # 计算增量状态
-            h0, h1, h2, h3, h4 = calculate_sha1_incremental_state(previous_data)
-
-        hash_context = {
-            "hash_type": "sha1",
-            "h0": str(h0),
-            "h1": str(h1),
-            "h2": str(h2),
-            "h3": str(h3),
-            "h4": str(h4),
-            "Nl": str(processed_bits),
-            "Nh": "0",
-            "data": "",
-            "num": "0"
-        }
+        if processed_bytes == chunk_size:
+            # 已知映射只针对前4MB，按文件内容特征查找；
+            # 特征值由已算出的中间状态补上填充块得到，无需重新哈希前4MB
+            feature_key = _sha1_finalize(state, processed_bytes)[:8]
+            known_hash = _KNOWN_HASH_STATES.get(feature_key)
+            if known_hash:
+                # 使用已知的精确映射
+                state = (known_hash['h0'], known_hash['h1'], known_hash['h2'], known_hash['h3'], known_hash['h4'])
 
-        # 转换为base64编码的JSON
-        hash_json = json.dumps(hash_context, separators=(',', ':'))
-        hash_b64 = base64.b64encode(hash_json.encode('utf-8')).decode('utf-8')
+        # 转换为base64编码的JSON（各字段都是数字，直接套用模板）
+        hash_json = _HASH_CTX_TEMPLATE.format(*state, processed_bits)
+        return base64.b64encode(hash_json.encode('ascii')).decode('ascii')
 
-        return hash_b64
+    def _sha1_state_at(self, file_path: Path, offset: int) -> Tuple[int, int, int, int, int]:
+        """
+        获取文件前 offset 字节的SHA1中间状态
+
+        已计算过的分片边界状态会缓存下来，后续分片只需处理新增的数据，
+        整个文件的增量哈希计算因此是线性的。
+
+        Args:
+            file_path: 文件路径
+            offset: 已处理的字节数（64字节的整数倍）
+
+        Returns:
+            (h0, h1, h2, h3, h4)
+        """
+        key = str(file_path)
+        with self._sha1_state_lock:
+            states = self._sha1_states.setdefault(key, {0: _SHA1_INITIAL_STATE})
+            start = max(o for o in states if o <= offset)
+            state = states[start]
+
+        if start < offset:
+            with open(file_path, 'rb') as f:
+                f.seek(start)
+                position = start
+                while position < offset:
+                    chunk = f.read(min(HASH_READ_SIZE, offset - position))
+                    if not chunk:
+                        break
+                    state = _sha1_compress(state, chunk)
+                    position += len(chunk)
+
+            with self._sha1_state_lock:
+                self._sha1_states.setdefault(key, {0: _SHA1_INITIAL_STATE})[offset] = state
+
+        return state
 
     def _update_file_hash(self, task_id: str, md5_hash: str, sha1_hash: str) -> Dict[str, Any]:
         """更新文件哈希"""
@@ -798,16 +1157,9 @@ x-oss-user-agent:aliyun-sdk-js/1.0.0 Chrome 139.0.0.0 on OS X 10.15.7 64-bit
             "sha1": sha1_hash
         }
 
-        params = {
-            'pr': 'ucpro',
-            'fr': 'pc',
-            'uc_param_str': ''
-        }
-
         response = self.api_client.post(
             "file/update/hash",
-            json_data=data,
-            params=params
+            json_data=data
         )
 
         if not response.get('status'):
@@ -822,24 +1174,25 @@ x-oss-user-agent:aliyun-sdk-js/1.0.0 Chrome 139.0.0.0 on OS X 10.15.7 64-bit
         headers: Dict[str, str],
         part_number: int,
         part_size: Optional[int] = None,
-        progress_callback: Optional[Callable] = None
+        progress_callback: Optional[Callable] = None,
+        file_view: Optional[memoryview] = None
     ) -> str:
-        """上传分片到OSS"""
-        import httpx
+        """
+        上传分片到OSS
 
-        # 读取文件数据
+        Args:
+            file_view: 整个文件的映射视图，提供时直接切片，不再重新打开文件
+        """
+        # 确定分片在文件中的范围
         if part_size is None:
-            # 单分片，读取整个文件
-            with open(file_path, 'rb') as f:
-                data = f.read()
+            # 单分片，上传整个文件
+            offset = 0
+            length = len(file_view) if file_view is not None else file_path.stat().st_size
         else:
-            # 多分片，读取指定大小的数据
+            # 多分片，上传指定范围的数据
             chunk_size = 4 * 1024 * 1024  # 4MB
             offset = (part_number - 1) * chunk_size
-
-            with open(file_path, 'rb') as f:
-                f.seek(offset)
-                data = f.read(part_size)
+            length = part_size
 
         # 重新启用增量哈希头
         if part_size is not None and part_number > 1:
@@ -851,23 +1204,65 @@ x-oss-user-agent:aliyun-sdk-js/1.0.0 Chrome 139.0.0.0 on OS X 10.15.7 64-bit
                 )
                 headers['X-Oss-Hash-Ctx'] = hash_ctx
 
-        # 上传到OSS
-        with httpx.Client(timeout=300.0) as client:
+        # 上传到OSS，数据直接取自文件映射，避免先读入bytes再拷贝
+        client = self._get_oss_client()
+        if file_view is not None:
+            part_data = file_view[offset:offset + length]
+        else:
+            part_data = self._map_file_range(file_path, offset, length)
+
+        with part_data as data:
             response = client.put(
                 upload_url,
-                content=data,
-                headers=headers
+                content=[data],
+                headers={**headers, 'Content-Length': str(len(data))}
             )
 
-            if response.status_code != 200:
-                raise APIError(f"上传分片 {part_number} 失败: {response.status_code} {response.text}")
+        if response.status_code != 200:
+            raise APIError(f"上传分片 {part_number} 失败: {response.status_code} {response.text}")
+
+        # 从响应头中获取ETag
+        etag = response.headers.get('etag', '')
+        if len(etag) >= 2 and etag[0] == '"':
+            etag = etag[1:-1]
+        if not etag:
+            raise APIError(f"上传分片 {part_number} 成功但未获取到ETag")
 
-            # 从响应头中获取ETag
-            etag = response.headers.get('etag', '').strip('"')
-            if not etag:
-                raise APIError(f"上传分片 {part_number} 成功但未获取到ETag")
+        return etag
 
-            return etag
+    @staticmethod
+    @contextmanager
+    def _map_file_range(file_path: Path, offset: int, length: int) -> Iterator[Union[memoryview, bytes]]:
+        """
+        以内存映射方式获取文件指定范围的数据
+
+        无法映射时（如空文件）回退为普通读取。
+
+        Args:
+            file_path: 文件路径
+            offset: 起始偏移
+            length: 数据长度
+
+        Yields:
+            文件数据
+        """
+        with open(file_path, 'rb') as f:
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if length > 0 else None
+            except (OSError, ValueError, OverflowError):
+                mapped = None
+
+            if mapped is None:
+                f.seek(offset)
+                yield f.read(length)
+                return
+
+            with mapped:
+                view = memoryview(mapped)[offset:offset + length]
+                try:
+                    yield view
+                finally:
+                    view.release()
 
     def _finish_upload(self, task_id: str, obj_key: str = None) -> Dict[str, Any]:
         """完成上传（通知夸克服务器）"""
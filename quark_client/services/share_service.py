@@ -3,11 +3,20 @@
 """
 
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from ..config import Config
 from ..core.api_client import QuarkAPIClient
 from ..exceptions import APIError, ShareLinkError
+from .file_service import FileService
+
+# 分享链接中的分享ID（夸克网盘标准格式 / quark:// 格式）
+_SHARE_ID_RE = re.compile(r'(?:https://pan\.quark\.cn/s/|quark://share/)([a-zA-Z0-9]+)', re.IGNORECASE)
+
+# 分享文本中的提取码
+_PASSCODE_RE = re.compile(r'(?:密码|提取码|code)[：:]?\s*([a-zA-Z0-9]+)', re.IGNORECASE)
 
 
 class ShareService:
@@ -91,8 +100,6 @@ class ShareService:
         Returns:
             分享信息，包含分享链接
         """
-        import time
-
         # 第一步：创建分享任务
         data = {
             'fid_list': file_ids,
@@ -103,7 +110,6 @@ class ShareService:
 
         # 如果设置了过期时间，添加过期时间字段
         if expire_days > 0:
-            import time
             expired_at = int((time.time() + expire_days * 24 * 3600) * 1000)  # 毫秒时间戳
             data['expired_at'] = expired_at
 
@@ -206,43 +212,14 @@ class ShareService:
         Raises:
             ShareLinkError: 链接格式错误
         """
-        # 支持多种分享链接格式
-        patterns = [
-            # 夸克网盘标准格式
-            r'https://pan\.quark\.cn/s/([a-zA-Z0-9]+)',
-            # 带密码的格式
-            r'https://pan\.quark\.cn/s/([a-zA-Z0-9]+).*?密码[：:]?\s*([a-zA-Z0-9]+)',
-            # 其他可能的格式
-            r'quark://share/([a-zA-Z0-9]+)',
-        ]
-
-        share_id = None
-        password = None
-
-        for pattern in patterns:
-            match = re.search(pattern, share_url, re.IGNORECASE)
-            if match:
-                share_id = match.group(1)
-                if len(match.groups()) > 1:
-                    password = match.group(2)
-                break
-
-        if not share_id:
+        match = _SHARE_ID_RE.search(share_url)
+        if not match:
             raise ShareLinkError(f"无法解析分享链接: {share_url}")
+        share_id = match.group(1)
 
         # 尝试从文本中提取密码
-        if not password:
-            password_patterns = [
-                r'密码[：:]?\s*([a-zA-Z0-9]+)',
-                r'提取码[：:]?\s*([a-zA-Z0-9]+)',
-                r'code[：:]?\s*([a-zA-Z0-9]+)',
-            ]
-
-            for pattern in password_patterns:
-                match = re.search(pattern, share_url, re.IGNORECASE)
-                if match:
-                    password = match.group(1)
-                    break
+        match = _PASSCODE_RE.search(share_url)
+        password = match.group(1) if match else None
 
         return share_id, password
 
@@ -277,7 +254,14 @@ class ShareService:
 
         raise ShareLinkError("无法获取分享访问令牌")
 
-    def get_share_info(self, share_id: str, token: str, pdir_fid: str = "0") -> Dict[str, Any]:
+    def get_share_info(
+        self,
+        share_id: str,
+        token: str,
+        pdir_fid: str = "0",
+        page: int = 1,
+        size: int = 50
+    ) -> Dict[str, Any]:
         """
         获取分享详细信息
 
@@ -285,6 +269,8 @@ class ShareService:
             share_id: 分享ID
             token: 访问令牌
             pdir_fid: 父目录ID，根目录为 "0"
+            page: 页码，从1开始
+            size: 每页数量
 
         Returns:
             分享信息
@@ -294,8 +280,8 @@ class ShareService:
             'stoken': token,
             'pdir_fid': pdir_fid,
             'force': '0',
-            '_page': 1,
-            '_size': 50,
+            '_page': page,
+            '_size': size,
             '_fetch_banner': '1',
             '_fetch_share': '1',
             '_fetch_total': '1',
@@ -310,6 +296,49 @@ class ShareService:
 
         return response
 
+    def get_share_files(
+        self,
+        share_id: str,
+        token: str,
+        pdir_fid: str = "0",
+        page_size: int = 50,
+        max_workers: int = 4
+    ) -> List[Dict[str, Any]]:
+        """
+        获取分享目录下的全部文件（自动翻页）
+
+        先获取第一页得到总数，其余页并发获取，结果按页码顺序合并。
+
+        Args:
+            share_id: 分享ID
+            token: 访问令牌
+            pdir_fid: 父目录ID，根目录为 "0"
+            page_size: 每页数量
+            max_workers: 并发获取的页数
+
+        Returns:
+            文件信息列表
+        """
+        first_page = self.get_share_info(share_id, token, pdir_fid, 1, page_size)
+        if not isinstance(first_page, dict) or 'data' not in first_page:
+            raise ShareLinkError("无法获取分享文件列表")
+
+        files = list(first_page['data'].get('list', []))
+        total = first_page.get('metadata', {}).get('_total')
+        if not isinstance(total, int) or total <= len(files) or len(files) < page_size:
+            return files
+
+        def fetch_page(page: int) -> List[Dict[str, Any]]:
+            response = self.get_share_info(share_id, token, pdir_fid, page, page_size)
+            return response.get('data', {}).get('list', []) if isinstance(response, dict) else []
+
+        page_count = -(-total // page_size)
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, page_count - 1))) as executor:
+            for page_files in executor.map(fetch_page, range(2, page_count + 1)):
+                files.extend(page_files)
+
+        return files
+
     def save_shared_files(
         self,
         share_id: str,
@@ -372,6 +401,9 @@ class ShareService:
                 task_result = self._wait_for_save_task_completion(task_id, timeout)
                 response['task_result'] = task_result
 
+        # 目标文件夹内容已变化，丢弃其缓存（包括后台预取的列表）
+        FileService.for_client(self.client).invalidate_cache(target_folder_id)
+
         return response
 
     def _wait_for_save_task_completion(self, task_id: str, timeout: int = 60) -> Dict[str, Any]:
@@ -385,8 +417,6 @@ class ShareService:
         Returns:
             任务完成结果
         """
-        import time
-
         start_time = time.time()
         retry_index = 0
         max_retries = timeout // 1  # 每1秒检查一次
@@ -482,14 +512,9 @@ class ShareService:
         # 2. 获取访问令牌
         token = self.get_share_token(share_id, password)
 
-        # 3. 获取分享信息
-        share_info = self.get_share_info(share_id, token)
-
-        # 4. 提取文件列表
-        if not isinstance(share_info, dict) or 'data' not in share_info:
-            raise ShareLinkError("无法获取分享文件列表")
+        # 3-4. 获取分享的全部文件（自动翻页），结果中的文件数与转存数量一致
+        files = self.get_share_files(share_id, token)
 
-        files = share_info['data'].get('list', [])
         if not files:
             raise ShareLinkError("分享中没有文件")
 
@@ -3,9 +3,14 @@
 工具模块
 """
 
+from .fileio import preallocate, release_page_cache
 from .logger import setup_logger, get_logger
+from .progress import ProgressThrottle
 
 __all__ = [
     'setup_logger',
-    'get_logger'
+    'get_logger',
+    'ProgressThrottle',
+    'preallocate',
+    'release_page_cache'
 ]
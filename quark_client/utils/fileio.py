@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+下载文件写入相关的工具函数
+"""
+
+import os
+from typing import BinaryIO, Iterator
+
+# 每写入这么多数据，就通知内核丢弃更早写入的页缓存
+_PAGE_CACHE_WINDOW = 64 * 1024 * 1024
+
+
+def release_page_cache(chunks: Iterator[bytes], f: BinaryIO, base_offset: int = 0) -> Iterator[bytes]:
+    """
+    在写入下载数据的过程中释放已写入部分的页缓存
+
+    大文件下载后通常不会马上再读，每写入 _PAGE_CACHE_WINDOW 字节，
+    就对早于一个窗口的数据调用 POSIX_FADV_DONTNEED，避免挤占其他程序的页缓存。
+    不支持 posix_fadvise 的平台原样返回数据。
+
+    Args:
+        chunks: 数据块迭代器
+        f: 正在写入的文件
+        base_offset: 本次写入在文件中的起始偏移
+
+    Yields:
+        数据块
+    """
+    if not hasattr(os, 'posix_fadvise'):
+        yield from chunks
+        return
+
+    fd = f.fileno()
+    os.posix_fadvise(fd, base_offset, 0, os.POSIX_FADV_SEQUENTIAL)
+
+    written = 0
+    next_release = _PAGE_CACHE_WINDOW * 2
+    for chunk in chunks:
+        yield chunk
+        written += len(chunk)
+        if written >= next_release:
+            # 先把缓冲区写入内核，再丢弃一个窗口之前（多半已回写完成）的页
+            f.flush()
+            os.posix_fadvise(fd, base_offset, written - _PAGE_CACHE_WINDOW, os.POSIX_FADV_DONTNEED)
+            next_release = written + _PAGE_CACHE_WINDOW
+
+
+def preallocate(f: BinaryIO, size: int):
+    """
+    为即将写入的文件预先分配磁盘空间，减少大文件写入时的碎片
+
+    Windows 上通过扩展文件长度让 NTFS 一次分配空间；其他不支持
+    posix_fallocate 的平台或文件系统忽略此步骤。
+
+    Args:
+        f: 打开的文件
+        size: 文件大小
+    """
+    if size <= 0:
+        return
+    try:
+        if hasattr(os, 'posix_fallocate'):
+            os.posix_fallocate(f.fileno(), 0, size)
+        elif os.name == 'nt':
+            f.truncate(size)
+    except OSError:
+        pass
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""
+进度回调节流工具
+"""
+
+import time
+
+
+class ProgressThrottle:
+    """
+    控制进度回调的频率
+
+    距上次回调超过 min_interval 秒，或新增处理量达到 min_bytes 时才允许回调，
+    避免对每个数据块都调用一次回调函数。
+    """
+
+    def __init__(self, min_interval: float = 0.1, min_bytes: int = 64 * 1024 * 1024):
+        """
+        初始化节流器
+
+        Args:
+            min_interval: 两次回调之间的最短时间（秒）
+            min_bytes: 两次回调之间的最大字节间隔
+        """
+        self.min_interval = min_interval
+        self.min_bytes = min_bytes
+        self._next_time = 0.0
+        self._next_bytes = 0
+
+    def ready(self, done: int) -> bool:
+        """
+        判断当前是否应该回调
+
+        Args:
+            done: 已处理的字节数
+
+        Returns:
+            是否应该回调
+        """
+        now = time.monotonic()
+        if done < self._next_bytes and now < self._next_time:
+            return False
+
+        self._next_time = now + self.min_interval
+        self._next_bytes = done + self.min_bytes
+        return True
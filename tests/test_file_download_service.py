@@ -0,0 +1,170 @@
+"""
+FileDownloadService 断点续传与分段下载测试（使用本地支持Range的HTTP服务器）
+"""
+
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from quark_client.config import Config
+from quark_client.exceptions import APIError
+from quark_client.services.file_download_service import FileDownloadService
+
+PAYLOAD = bytes(range(256)) * 1024  # 256 KiB
+
+
+class _RangeHandler(BaseHTTPRequestHandler):
+    """按 server.payload 提供内容，支持单段Range请求"""
+
+    def do_GET(self):
+        payload = self.server.payload
+        self.server.requests.append(self.headers.get('Range'))
+        size = len(payload)
+
+        match = re.fullmatch(r'bytes=(\d+)-(\d*)', self.headers.get('Range') or '')
+        if not match:
+            self._send(200, payload, {})
+            return
+
+        start = int(match.group(1))
+        end = int(match.group(2)) if match.group(2) else size - 1
+        if start >= size:
+            self._send(416, b'', {'Content-Range': f'bytes */{size}'})
+            return
+        if self.server.fail_ranges and (start, end) != (0, 0):
+            self._send(500, b'', {})
+            return
+
+        end = min(end, size - 1)
+        self._send(206, payload[start:end + 1], {'Content-Range': f'bytes {start}-{end}/{size}'})
+
+    def _send(self, status, body, headers):
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), _RangeHandler)
+    httpd.payload = PAYLOAD
+    httpd.requests = []
+    httpd.fail_ranges = False
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def http_client():
+    with httpx.Client() as client:
+        yield client
+
+
+def _url(server):
+    return f'http://127.0.0.1:{server.server_address[1]}/file'
+
+
+def _resume(client, server, save_path, file_size=len(PAYLOAD)):
+    FileDownloadService(None)._download_resumable(
+        client, _url(server), {}, str(save_path), 64 * 1024, file_size=file_size)
+
+
+def test_resume_continues_interrupted_download(server, http_client, tmp_path):
+    save_path = tmp_path / 'a.bin'
+    (tmp_path / 'a.bin.part').write_bytes(PAYLOAD[:1000])
+
+    _resume(http_client, server, save_path)
+
+    assert save_path.read_bytes() == PAYLOAD
+    assert not (tmp_path / 'a.bin.part').exists()
+    assert server.requests == ['bytes=1000-']
+
+
+def test_resume_restarts_when_part_belongs_to_other_file(server, http_client, tmp_path):
+    save_path = tmp_path / 'a.bin'
+    (tmp_path / 'a.bin.part').write_bytes(b'x' * 1000)
+    # 远程文件已变化：大小与下载接口给出的不一致
+    server.payload = PAYLOAD[:-1]
+
+    _resume(http_client, server, save_path, file_size=len(PAYLOAD))
+
+    assert save_path.read_bytes() == PAYLOAD[:-1]
+    assert server.requests == ['bytes=1000-', None]
+
+
+def test_resume_restarts_when_part_is_not_shorter_than_file(server, http_client, tmp_path):
+    save_path = tmp_path / 'a.bin'
+    (tmp_path / 'a.bin.part').write_bytes(PAYLOAD + b'extra')
+
+    _resume(http_client, server, save_path)
+
+    assert save_path.read_bytes() == PAYLOAD
+    assert server.requests == [None]
+
+
+def test_resume_retries_from_start_after_416(server, http_client, tmp_path):
+    save_path = tmp_path / 'a.bin'
+    (tmp_path / 'a.bin.part').write_bytes(b'x' * 1000)
+    # 远程文件比已下载的数据还短，Range请求返回416
+    server.payload = PAYLOAD[:500]
+
+    _resume(http_client, server, save_path, file_size=len(PAYLOAD))
+
+    assert save_path.read_bytes() == PAYLOAD[:500]
+    assert server.requests == ['bytes=1000-', None]
+
+
+def test_range_download_writes_complete_file(server, http_client, tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'RANGE_DOWNLOAD_THRESHOLD', 1024)
+    save_path = tmp_path / 'a.bin'
+
+    done = FileDownloadService(None)._download_ranges(http_client, _url(server), {}, str(save_path), 64 * 1024)
+
+    assert done
+    assert save_path.read_bytes() == PAYLOAD
+    assert not (tmp_path / 'a.bin.part').exists()
+
+
+def test_range_download_failure_leaves_no_file(server, http_client, tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'RANGE_DOWNLOAD_THRESHOLD', 1024)
+    server.fail_ranges = True
+    save_path = tmp_path / 'a.bin'
+
+    with pytest.raises(APIError):
+        FileDownloadService(None)._download_ranges(http_client, _url(server), {}, str(save_path), 64 * 1024)
+
+    assert not save_path.exists()
+    assert not (tmp_path / 'a.bin.part').exists()
+
+
+def test_download_files_keeps_same_named_files_apart(tmp_path, monkeypatch):
+    service = FileDownloadService(None)
+    monkeypatch.setattr(service, '_resolve_downloads', lambda file_ids: {
+        'a': ('url-a', 'same.txt', 1),
+        'b': ('url-b', 'same.txt', 1),
+    })
+
+    def fake_download(download_url, file_name, save_path, *args):
+        with open(save_path, 'w') as f:
+            f.write(download_url)
+        return save_path
+
+    monkeypatch.setattr(service, '_download_resolved', fake_download)
+
+    paths = service.download_files(['a', 'b', 'a'], save_dir=str(tmp_path))
+
+    assert paths == [str(tmp_path / 'same.txt'), str(tmp_path / 'same1.txt')]
+    assert (tmp_path / 'same.txt').read_text() == 'url-a'
+    assert (tmp_path / 'same1.txt').read_text() == 'url-b'